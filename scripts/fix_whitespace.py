@@ -8,50 +8,107 @@ PEP 8のスタイル問題を自動修正するための
 - ファイル末尾の余分な空行修正 (W391)
 """
 
+import mmap
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
+# 行末の空白 (W291, W293)
+# str.rstrip() と同じく、全角スペース (U+3000) などUnicodeの空白も対象とする
+_TRAILING_WS = re.compile(r'[^\S\n]+(?=\n)')
 
-def fix_whitespace_issues(file_path):
-    """ファイル内の空白関連の問題を修正する"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+# 行末に空白がある可能性のある行 (mmap 上の事前判定用)
+# 非ASCIIのバイトで終わる行はUnicodeの空白かもしれないため、デコードして確認する
+_MAYBE_TRAILING_WS = re.compile(rb'[ \t\r\f\v\x1c-\x1f\x80-\xff](?=\n)')
+
+# 走査対象から除外するディレクトリ
+SKIP_DIRS = {
+    '.git', '__pycache__', '.venv', 'venv', 'node_modules',
+    '.mypy_cache', '.pytest_cache', 'build', 'dist',
+}
+
+
+def fix_whitespace_bytes(data):
+    """
+    ファイル内容 (UTF-8のbytes) の空白関連の問題を修正した結果を返す
+    """
+    # Remove trailing whitespace (including whitespace-only lines)
+    # and fix end of file (ensure exactly one newline at the end).
+    # rstrip only touches the tail, so the body is scanned once.
+    text = _TRAILING_WS.sub('', data.decode('utf-8')).rstrip()
+    if text:
+        text += '\n'
 
-    # Remove trailing whitespace
-    lines = [line.rstrip() + '\n' for line in lines]
+    return text.encode('utf-8')
 
-    # Remove blank lines with whitespace
-    for i in range(len(lines)):
-        if lines[i].strip() == '':
-            lines[i] = '\n'
 
-    # Fix end of file (ensure exactly one newline at the end)
-    if lines and lines[-1].strip() == '':
-        while len(lines) > 1 and lines[-2].strip() == '':
-            lines.pop()
+def _needs_fix(file_path):
+    """
+    ファイルに修正が必要な可能性があるかを判定する
+    mmap 上で検索するため、問題のないファイルは bytes として読み込まない
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # 末尾は改行1つで終わり、その直前が空白でないこと
+            if mm[-1:] != b'\n' or len(mm) < 2 or mm[-2:-1] == b'\n':
+                return True
+            return _MAYBE_TRAILING_WS.search(mm) is not None
 
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.writelines(lines)
 
+def fix_whitespace_issues(file_path):
+    """
+    ファイル内の空白関連の問題を修正する
+    内容が変わらない場合は書き込みを行わない
+    """
+    if not _needs_fix(file_path):
+        return False
+
+    path = Path(file_path)
+    data = path.read_bytes()
+    fixed = fix_whitespace_bytes(data)
+    if fixed == data:
+        return False
+
+    path.write_bytes(fixed)
     return True
 
 
+def _fix_one(file_path):
+    """スレッドプールから呼び出す1ファイル分の処理"""
+    return file_path, fix_whitespace_issues(file_path)
+
+
+def _iter_targets(directory):
+    """
+    os.scandir でディレクトリを再帰的に走査し、
+    対象ファイル (.py / .md) のパスを返す
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in SKIP_DIRS:
+                    continue
+                yield from _iter_targets(entry.path)
+            elif entry.name.endswith(('.py', '.md')):
+                yield entry.path
+
+
 def process_directory(directory):
     """
     指定されたディレクトリ内の
-    ファイルの空白問題を修正する
+    ファイルの空白問題を並行して修正する
     """
     count = 0
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.py') or file.endswith('.md'):
-                file_path = os.path.join(root, file)
-                original = open(file_path, 'r', encoding='utf-8').read()
-                fix_whitespace_issues(file_path)
-                new = open(file_path, 'r', encoding='utf-8').read()
-                if original != new:
-                    count += 1
-                    print(f"Fixed: {file_path}")
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for file_path, changed in executor.map(_fix_one, _iter_targets(directory)):
+            if changed:
+                count += 1
+                print(f"Fixed: {file_path}")
 
     return count
 
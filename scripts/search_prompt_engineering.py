@@ -14,29 +14,39 @@ arXiv論文検索と管理スクリプト
 
 import os
 import sys
+import asyncio
+import atexit
+import threading
 import time
 import argparse
 import requests
 import re
-from datetime import datetime, date, timedelta
-from dateutil.relativedelta import relativedelta
+import shutil
+import shelve
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # 親ディレクトリをPythonパスに追加
 parent_dir = str(Path(__file__).resolve().parent.parent)
 if parent_dir not in sys.path:
     sys.path.append(parent_dir)
 
-from src.arxiv_harvester.api.client import ArxivApiClient
-from src.arxiv_harvester.store.database import DatabaseManager
-
 # ディレクトリ設定
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
 DB_PATH = os.path.join(DATA_DIR, 'arxiv_papers.db')
 PDF_DIR = os.path.join(DATA_DIR, 'pdfs')
 
+# APIレスポンスのキャッシュ (同じ検索条件の再実行時にAPIを呼ばない)
+API_CACHE_PATH = os.path.join(DATA_DIR, 'api_cache')
+API_CACHE_TTL = 60 * 60  # 1時間
+
+# PDFダウンロード時の読み書き単位 (128 KiB)
+PDF_CHUNK_SIZE = 128 * 1024
+
 # 必要なディレクトリを作成
 for directory in [DATA_DIR, PDF_DIR]:
     if not os.path.exists(directory):
@@ -60,6 +70,18 @@ ARXIV_CATEGORIES = {
 SORT_OPTIONS = ['relevance', 'lastUpdatedDate', 'submittedDate']
 SORT_DIRECTIONS = ['ascending', 'descending']
 
+# 期間プリセットオプション (引数名 -> 期間指定文字列)
+PERIOD_PRESETS = {
+    'last_week': '1w',
+    'last_month': '1m',
+    'last_3_months': '3m',
+    'last_6_months': '6m',
+    'last_year': '1y',
+}
+
+# arXiv APIへのリクエスト間隔の下限 (秒)
+REQUEST_INTERVAL = 3.0
+
 # 期間パターンマッチング用の正規表現
 TIME_PATTERN = re.compile(r'^(\d+)([dDwWmMyY])$')  # 例: 3d, 2w, 1m, 5y
 
@@ -75,6 +97,23 @@ def parse_time_period(period_str: str) -> Tuple[datetime, datetime]:
     """
     相対的な期間指定の文字列を解析し、開始日と終了日を返す
     
+    同じ文字列の解析結果は同一分内であればキャッシュされる
+    
+    Args:
+        period_str: 期間指定文字列 (形式は _parse_time_period_cached を参照)
+        
+    Returns:
+        (開始日, 終了日)のタプル
+    """
+    # 現在時刻を分単位に丸めてキャッシュキーとする
+    now = datetime.now().replace(second=0, microsecond=0)
+    return _parse_time_period_cached(period_str, now)
+
+@lru_cache(maxsize=64)
+def _parse_time_period_cached(period_str: str, now: datetime) -> Tuple[datetime, datetime]:
+    """
+    相対的な期間指定の文字列を解析し、開始日と終了日を返す
+    
     サポートする形式:
     - '3d': 過去3日間
     - '2w': 過去2週間
@@ -85,12 +124,14 @@ def parse_time_period(period_str: str) -> Tuple[datetime, datetime]:
     
     Args:
         period_str: 期間指定文字列
+        now: 基準となる現在時刻
         
     Returns:
         (開始日, 終了日)のタプル
     """
-    # 現在の日付を取得
-    end_date = datetime.now()
+    from dateutil.relativedelta import relativedelta
+    
+    end_date = now
     start_date = None
     
     # チルドで区切られた範囲指定 (YYYY-MM-DD~YYYY-MM-DD)
@@ -138,31 +179,96 @@ def parse_time_period(period_str: str) -> Tuple[datetime, datetime]:
 
 def format_date(dt: datetime) -> str:
     """datetimeオブジェクトをYYYY-MM-DD形式の文字列に変換"""
-    return dt.strftime("%Y-%m-%d")
+    return dt.date().isoformat()
+
+# PDFダウンロード用のスレッドプール (呼び出し間で再利用する)
+_PDF_POOL = None
+_PDF_POOL_WORKERS = 0
+_PDF_POOL_LOCK = threading.Lock()
+
+def _get_pdf_pool(max_workers: int) -> ThreadPoolExecutor:
+    """
+    PDFダウンロード用のスレッドプールを返す
+    ワーカー数が変わった場合のみ作り直す
+    """
+    global _PDF_POOL, _PDF_POOL_WORKERS
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None or _PDF_POOL_WORKERS != max_workers:
+            if _PDF_POOL is not None:
+                _PDF_POOL.shutdown(wait=True)
+            _PDF_POOL = ThreadPoolExecutor(max_workers=max_workers)
+            _PDF_POOL_WORKERS = max_workers
+        return _PDF_POOL
+
+def _shutdown_pdf_pool():
+    """終了時にPDFダウンロード用のスレッドプールを停止する"""
+    if _PDF_POOL is not None:
+        _PDF_POOL.shutdown()
+
+atexit.register(_shutdown_pdf_pool)
+
+def _pdf_target(paper: Dict[str, Any], output_dir: str) -> Tuple[str, str, str]:
+    """
+    論文のPDFのURLと保存先を求める
+    
+    Returns:
+        (PDFのURL, ファイル名, 保存先パス)のタプル
+    """
+    # ファイル名を生成 (論文IDを使用)
+    arxiv_id = paper['id'].split('/')[-1]
+    filename = f"{arxiv_id}.pdf"
+    
+    if 'pdf_url' not in paper or not paper['pdf_url']:
+        # PDF URLがない場合、arxiv_idから生成
+        pdf_url = f"http://arxiv.org/pdf/{arxiv_id}.pdf"
+    else:
+        pdf_url = paper['pdf_url']
+    
+    return pdf_url, filename, os.path.join(output_dir, filename)
+
+def _remove_partial(partpath: str):
+    """ダウンロード途中の一時ファイルがあれば削除する"""
+    try:
+        os.remove(partpath)
+    except OSError:
+        pass
+
+def _split_existing(papers: List[Dict[str, Any]], output_dir: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    ダウンロード済みの論文と未取得の論文を振り分ける
+    (書き込み途中の .part ファイルはダウンロード済みとみなさない)
+    
+    Returns:
+        (既存のPDFファイルのパスリスト, 未取得の論文のリスト)のタプル
+    """
+    existing = set(os.listdir(output_dir))
+    existing_paths = []
+    pending = []
+    for paper in papers:
+        filename = f"{paper['id'].rsplit('/', 1)[-1]}.pdf"
+        if filename in existing:
+            print(f"  Skipping {filename} (already exists)")
+            existing_paths.append(os.path.join(output_dir, filename))
+        else:
+            pending.append(paper)
+    return existing_paths, pending
 
 # PDFダウンロード関数
-def download_pdf(paper: Dict[str, Any], output_dir: str) -> Optional[str]:
+def download_pdf(paper: Dict[str, Any], output_dir: str,
+                 session: Optional[requests.Session] = None) -> Optional[str]:
     """
     論文のPDFをダウンロードして保存する
     
     Args:
         paper: 論文データ
         output_dir: 出力ディレクトリ
+        session: 接続を再利用するためのセッション (省略時は requests を直接使用)
         
     Returns:
         保存されたPDFファイルのパス、失敗した場合はNone
     """
-    if 'pdf_url' not in paper or not paper['pdf_url']:
-        # PDF URLがない場合、arxiv_idから生成
-        arxiv_id = paper['id'].split('/')[-1]
-        pdf_url = f"http://arxiv.org/pdf/{arxiv_id}.pdf"
-    else:
-        pdf_url = paper['pdf_url']
-        
-    # ファイル名を生成 (論文IDを使用)
-    arxiv_id = paper['id'].split('/')[-1]
-    filename = f"{arxiv_id}.pdf"
-    filepath = os.path.join(output_dir, filename)
+    pdf_url, filename, filepath = _pdf_target(paper, output_dir)
+    partpath = filepath + '.part'
     
     # すでに存在する場合はスキップ
     if os.path.exists(filepath):
@@ -171,18 +277,22 @@ def download_pdf(paper: Dict[str, Any], output_dir: str) -> Optional[str]:
         
     try:
         print(f"  Downloading {filename}...")
-        response = requests.get(pdf_url, stream=True, timeout=30)
+        http = session if session is not None else requests
+        response = http.get(pdf_url, stream=True, timeout=30)
         response.raise_for_status()
         
-        # PDFファイルを保存
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # PDFファイルを保存 (iter_content を経由せず生ストリームから直接コピー)
+        # 中断時に不完全なファイルが残らないよう、一時ファイルに書いてから置き換える
+        response.raw.decode_content = True
+        with open(partpath, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, PDF_CHUNK_SIZE)
+        os.replace(partpath, filepath)
                 
         print(f"  Downloaded {filename} successfully")
         return filepath
     except Exception as e:
         print(f"  Error downloading {filename}: {str(e)}")
+        _remove_partial(partpath)
         return None
         
 # 複数のPDFを並行ダウンロード
@@ -198,24 +308,126 @@ def download_pdfs(papers: List[Dict[str, Any]], output_dir: str, max_workers: in
     Returns:
         正常にダウンロードされたPDFファイルのパスリスト
     """
-    successful_downloads = []
+    # ダウンロード済みのPDFはスレッドプールに渡す前に除外する
+    successful_downloads, pending = _split_existing(papers, output_dir)
+    
+    print(f"Downloading {len(pending)} PDFs to {output_dir}...")
     
-    print(f"Downloading {len(papers)} PDFs to {output_dir}...")
+    # arxiv.org への接続をワーカー間で再利用する
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=3)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    executor = _get_pdf_pool(max_workers)
+    with session:
         # 各論文のPDFを並行ダウンロード
-        future_to_paper = {executor.submit(download_pdf, paper, output_dir): paper for paper in papers}
+        future_to_paper = {executor.submit(download_pdf, paper, output_dir, session): paper for paper in pending}
         
         # 結果を収集
-        for future in future_to_paper:
+        for future in as_completed(future_to_paper):
             filepath = future.result()
             if filepath:
                 successful_downloads.append(filepath)
     
     return successful_downloads
 
+async def _download_pdf_async(client, paper: Dict[str, Any], output_dir: str) -> Optional[str]:
+    """
+    論文のPDFを非同期にダウンロードして保存する
+    
+    Args:
+        client: httpx.AsyncClient のインスタンス
+        paper: 論文データ
+        output_dir: 出力ディレクトリ
+        
+    Returns:
+        保存されたPDFファイルのパス、失敗した場合はNone
+    """
+    pdf_url, filename, filepath = _pdf_target(paper, output_dir)
+    partpath = filepath + '.part'
+    
+    # ファイル操作はブロッキングするため、イベントループを止めないよう別スレッドで実行する
+    loop = asyncio.get_running_loop()
+    
+    try:
+        print(f"  Downloading {filename}...")
+        async with client.stream('GET', pdf_url) as response:
+            response.raise_for_status()
+            f = await loop.run_in_executor(None, open, partpath, 'wb')
+            try:
+                async for chunk in response.aiter_bytes(PDF_CHUNK_SIZE):
+                    await loop.run_in_executor(None, f.write, chunk)
+            finally:
+                await loop.run_in_executor(None, f.close)
+        await loop.run_in_executor(None, os.replace, partpath, filepath)
+        
+        print(f"  Downloaded {filename} successfully")
+        return filepath
+    except Exception as e:
+        print(f"  Error downloading {filename}: {str(e)}")
+        _remove_partial(partpath)
+        return None
+
+async def download_pdfs_async(papers: List[Dict[str, Any]], output_dir: str, max_concurrency: int = 20) -> List[str]:
+    """
+    複数の論文PDFを単一スレッドのイベントループ上で並行ダウンロードする
+    
+    httpx が必要 (pip install httpx)
+    
+    Args:
+        papers: 論文データのリスト
+        output_dir: 出力ディレクトリ
+        max_concurrency: 同時接続数の上限
+        
+    Returns:
+        正常にダウンロードされたPDFファイルのパスリスト
+    """
+    import httpx
+    
+    successful_downloads, pending = _split_existing(papers, output_dir)
+    
+    print(f"Downloading {len(pending)} PDFs to {output_dir}...")
+    
+    # 同時に走らせるダウンロードを接続数の上限に合わせる
+    # (接続待ちのダウンロードが接続プールのタイムアウトで失敗しないようにする)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def download(paper: Dict[str, Any]) -> Optional[str]:
+        async with semaphore:
+            return await _download_pdf_async(client, paper, output_dir)
+    
+    limits = httpx.Limits(max_connections=max_concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30, follow_redirects=True) as client:
+        results = await asyncio.gather(*(download(paper) for paper in pending))
+    
+    successful_downloads.extend(filepath for filepath in results if filepath)
+    return successful_downloads
+
+def _open_api_cache():
+    """APIレスポンスのキャッシュを開き、有効期限切れのエントリを削除する"""
+    cache = shelve.open(API_CACHE_PATH)
+    now = time.time()
+    expired = [key for key, (cached_at, _) in cache.items() if now - cached_at > API_CACHE_TTL]
+    for key in expired:
+        del cache[key]
+    return cache
+
+def _get_cached_batch(cache, key: str) -> Optional[List[Dict[str, Any]]]:
+    """キャッシュから有効期限内の検索結果を取り出す (期限切れのエントリは削除する)"""
+    if cache is None:
+        return None
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    cached_at, papers = entry
+    if time.time() - cached_at > API_CACHE_TTL:
+        del cache[key]
+        return None
+    return papers
+
 def fetch_all_papers(api_client, query, date_from_str, date_to_str, category=None, 
-sort_by="submittedDate", sort_order="descending"):
+sort_by="submittedDate", sort_order="descending", cache=None):
     """
     指定された検索条件に一致する全ての論文を取得する
     arXiv APIのページネーション制限に対応するため、複数回のAPIリクエストを実行する
@@ -228,9 +440,10 @@ sort_by="submittedDate", sort_order="descending"):
         category: arXivカテゴリでフィルタリング
         sort_by: ソート項目 (relevance, lastUpdatedDate, submittedDate)
         sort_order: ソート順序 (ascending, descending)
+        cache: APIレスポンスのキャッシュ (shelve.Shelf、Noneの場合はキャッシュしない)
     
-    Returns:
-        取得した論文のリスト
+    Yields:
+        APIから取得した1ページ分の論文のリスト
     """
     # ソートオプションの検証
     if sort_by not in SORT_OPTIONS:
@@ -242,8 +455,8 @@ sort_by="submittedDate", sort_order="descending"):
         sort_order = "descending"
     
     # 文字列形式の日付をdatetimeオブジェクトに変換
-    start_date = datetime.strptime(date_from_str, "%Y-%m-%d")
-    end_date = datetime.strptime(date_to_str, "%Y-%m-%d")
+    start_date = datetime.fromisoformat(date_from_str)
+    end_date = datetime.fromisoformat(date_to_str)
     
     print(f"\nSearch parameters:\n  - Query: {query}")
     if category:
@@ -251,26 +464,42 @@ sort_by="submittedDate", sort_order="descending"):
     print(f"  - Date range: {date_from_str} to {date_to_str}")
     print(f"  - Sort by: {sort_by} ({sort_order})\n")
     
-    all_papers = []
     batch_size = 100  # 各ページのサイズ (arXiv APIの推奨値)
     start = 0
     total_fetched = 0
+    last_request = None
     
     while True:
-        print(f"Fetching papers batch: start={start}, batch_size={batch_size}")
+        cache_key = f"{query}|{category}|{date_from_str}|{date_to_str}|{start}|{sort_by}|{sort_order}"
         
         try:
-            # 論文を取得
-            papers = api_client.search(
-                query=query,
-                category=category,
-                start_date=start_date,
-                end_date=end_date,
-                max_results=batch_size,
-                start=start,  # ページネーション用パラメータ
-                sort_by=sort_by,
-                sort_order=sort_order
-            )
+            papers = _get_cached_batch(cache, cache_key)
+            if papers is not None:
+                print(f"Using cached papers batch: start={start}, batch_size={batch_size}")
+            else:
+                # API制限を避けるため、前回のリクエスト開始から最低間隔が空くまでだけ待つ
+                if last_request is not None:
+                    remaining = REQUEST_INTERVAL - (time.monotonic() - last_request)
+                    if remaining > 0:
+                        print(f"Waiting {remaining:.1f} seconds before next request...")
+                        time.sleep(remaining)
+                
+                print(f"Fetching papers batch: start={start}, batch_size={batch_size}")
+                
+                # 論文を取得
+                last_request = time.monotonic()
+                papers = api_client.search(
+                    query=query,
+                    category=category,
+                    start_date=start_date,
+                    end_date=end_date,
+                    max_results=batch_size,
+                    start=start,  # ページネーション用パラメータ
+                    sort_by=sort_by,
+                    sort_order=sort_order
+                )
+                if cache is not None:
+                    cache[cache_key] = (time.time(), papers)
             
             # 結果がない場合は終了
             if not papers:
@@ -278,11 +507,12 @@ sort_by="submittedDate", sort_order="descending"):
                 break
                 
             batch_count = len(papers)
-            all_papers.extend(papers)
             total_fetched += batch_count
             
             print(f"Retrieved {batch_count} papers (Total: {total_fetched})")
             
+            yield papers
+            
             # 取得した論文数がバッチサイズより少ない場合は終了
             if batch_count < batch_size:
                 print("Reached the end of results.")
@@ -291,18 +521,12 @@ sort_by="submittedDate", sort_order="descending"):
             # 次のページに移動
             start += batch_size
             
-            # API制限を避けるための適切な間隔
-            print("Waiting 3 seconds before next request...")
-            time.sleep(3)
-            
         except Exception as e:
             print(f"Error fetching papers: {e}")
             # エラー発生時は少し待って再試行
             print("Waiting 10 seconds before retrying...")
             time.sleep(10)
             continue
-    
-    return all_papers
 
 
 def parse_arguments():
@@ -377,10 +601,16 @@ def parse_arguments():
     parser.add_argument('--parallel', '-p', type=int, default=3, 
                       help="Number of parallel downloads (default: 3)")
     
+    parser.add_argument('--async-download', action='store_true', 
+                      help="Download PDFs on an asyncio event loop with httpx (requires httpx)")
+    
     # データベース関連オプション
     parser.add_argument('--skip-db', action='store_true', 
                       help="Skip storing papers in the database")
     
+    parser.add_argument('--no-cache', action='store_true', 
+                      help="Always query the arXiv API instead of using cached responses")
+    
     parser.add_argument('--list-categories', '-l', action='store_true', 
                       help="List available arXiv categories and exit")
     
@@ -403,6 +633,10 @@ def main():
         list_categories()
         return
     
+    # 一覧表示やヘルプでは不要なため、ここで初めて読み込む
+    from src.arxiv_harvester.api.client import ArxivApiClient
+    from src.arxiv_harvester.store.database import DatabaseManager
+    
     # クライアントとデータベースの初期化
     print("Initializing clients...")
     api_client = ArxivApiClient()
@@ -416,16 +650,9 @@ def main():
     period_str = None
     
     # プリセットオプションの処理
-    if args.last_week:
-        period_str = "1w"
-    elif args.last_month:
-        period_str = "1m"
-    elif args.last_3_months:
-        period_str = "3m"
-    elif args.last_6_months:
-        period_str = "6m"
-    elif args.last_year:
-        period_str = "1y"
+    preset = next((period for option, period in PERIOD_PRESETS.items() if getattr(args, option)), None)
+    if preset:
+        period_str = preset
     # 直接期間指定
     elif args.period:
         period_str = args.period
@@ -449,43 +676,78 @@ def main():
     date_from_str = format_date(start_date)
     date_to_str = format_date(end_date)
     
-    # 全ての論文を取得
-    all_papers = fetch_all_papers(
-        api_client, 
-        args.query, 
-        date_from_str, 
-        date_to_str, 
-        category=args.category,
-        sort_by=args.sort_by,
-        sort_order=args.sort_order
-    )
-    
-    total_papers = len(all_papers)
+    # 論文をページ単位で取得し、そのままデータベースへ保存する
+    # (全件をメモリに保持せず、表示用とダウンロード用に必要な分だけ残す)
+    # 保存済みの論文IDを一度に取得し、重複した保存を避ける
+    # (保存済みの論文も表示とPDFダウンロードの対象には含める)
+    known_ids = db_manager.known_ids(start_date, end_date) if not args.skip_db else None
+    
+    total_papers = 0
+    stored_papers = 0
+    latest_papers = []
+    papers_to_download = []
+    
+    # 同じ検索条件の再実行ではキャッシュ済みのAPIレスポンスを使う
+    cache = None if args.no_cache else _open_api_cache()
+    try:
+        for batch in fetch_all_papers(
+            api_client, 
+            args.query, 
+            date_from_str, 
+            date_to_str, 
+            category=args.category,
+            sort_by=args.sort_by,
+            sort_order=args.sort_order,
+            cache=cache
+        ):
+            total_papers += len(batch)
+        
+            if len(latest_papers) < 5:
+                latest_papers.extend(batch[:5 - len(latest_papers)])
+        
+            if args.download_pdf:
+                # ダウンロード数の制限処理 (0 の場合は全件)
+                if args.max_downloads <= 0:
+                    papers_to_download.extend(batch)
+                elif len(papers_to_download) < args.max_downloads:
+                    papers_to_download.extend(batch[:args.max_downloads - len(papers_to_download)])
+        
+            # データベースへの保存 (保存済みの論文は除く)
+            if not args.skip_db:
+                new_papers = [p for p in batch if p['id'].rsplit('/', 1)[-1] not in known_ids]
+                if len(new_papers) < len(batch):
+                    print(f"Skipped {len(batch) - len(new_papers)} papers already in the database")
+                if not new_papers:
+                    continue
+                try:
+                    # store_papersメソッドは値を返さないが、エラーがスローされなければ成功
+                    db_manager.store_papers(new_papers)
+                    stored_papers += len(new_papers)
+                except Exception as e:
+                    print(f"Error storing papers: {str(e)}")
+    finally:
+        if cache is not None:
+            cache.close()
+    
     print(f"Found a total of {total_papers} papers matching the criteria")
     
     # データがない場合は終了
-    if not all_papers:
+    if not total_papers:
         print("No papers found matching the criteria.")
         return
     
-    # データベースへの保存
     if not args.skip_db:
-        print("\nStoring papers in database...")
-        try:
-            # store_papersメソッドは値を返さないが、エラーがスローされなければ成功
-            db_manager.store_papers(all_papers)
-            print(f"Successfully stored {total_papers} papers in the database at {DB_PATH}")
-        except Exception as e:
-            print(f"Error storing papers: {str(e)}")
+        print(f"Successfully stored {stored_papers} papers in the database at {DB_PATH}")
     
     # PDFダウンロード
     if args.download_pdf:
-        # ダウンロード数の制限処理
-        max_downloads = args.max_downloads if args.max_downloads > 0 else total_papers
-        papers_to_download = all_papers[:max_downloads]
-        
         print(f"\nDownloading PDFs ({len(papers_to_download)} of {total_papers} papers)...")
-        downloaded_files = download_pdfs(papers_to_download, PDF_DIR, max_workers=args.parallel)
+        if args.async_download:
+            downloaded_files = asyncio.run(
+                download_pdfs_async(papers_to_download, PDF_DIR, max_concurrency=args.parallel)
+            )
+        else:
+            downloaded_files = download_pdfs(papers_to_download, PDF_DIR, max_workers=args.parallel)
         
         print(f"\nDownloaded {len(downloaded_files)} PDFs to {PDF_DIR}")
         if len(downloaded_files) < len(papers_to_download):
@@ -493,7 +755,7 @@ def main():
     
     # 最新の5件を表示
     print("\nLatest 5 papers:\n")
-    for i, paper in enumerate(all_papers[:5]):
+    for i, paper in enumerate(latest_papers):
         print(f"{i+1}. {paper['title']}")
         print(f"   Authors: {', '.join(paper['authors'])}")
         print(f"   Published: {paper['published_date']}")
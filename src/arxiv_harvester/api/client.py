@@ -1,12 +1,88 @@
 """Client for interacting with the arXiv API."""
 
+import copy
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
 import time
-import json
+import urllib.parse
 from datetime import datetime
-import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from typing import Dict, List, Any
 
+try:
+    # libxml2-backed parser; much faster on large Atom feeds
+    from lxml import etree as ET
+    _HAVE_LXML = True
+except ImportError:  # pragma: no cover - fall back to the standard library
+    import xml.etree.ElementTree as ET
+    _HAVE_LXML = False
+
+try:
+    # Faster JSON decoding straight from bytes
+    from orjson import loads as _json_loads
+except ImportError:  # pragma: no cover - fall back to the standard library
+    from json import loads as _json_loads
+
+# Namespace-qualified (Clark notation) Atom tags, resolved once at import
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ENTRY = _ATOM + "entry"
+_ID = _ATOM + "id"
+_TITLE = _ATOM + "title"
+_SUMMARY = _ATOM + "summary"
+_AUTHOR = _ATOM + "author"
+_NAME = _ATOM + "name"
+_PUBLISHED = _ATOM + "published"
+_LINK = _ATOM + "link"
+
+
+def _iter_xml_entries(source):
+    """Stream the Atom <entry> elements of an XML response.
+
+    Args:
+        source: Binary file-like object holding the XML document
+
+    Each entry is cleared once the caller has moved on to the next one, so
+    peak memory stays at roughly one entry instead of the whole feed.
+    Entities are left unexpanded and nothing is fetched from the network,
+    since the feed arrives over plain HTTP.
+    """
+    if _HAVE_LXML:
+        for _, elem in ET.iterparse(source, events=("end",), tag=_ENTRY,
+                                    resolve_entities=False, no_network=True):
+            yield elem
+            elem.clear()
+            # Drop already-processed siblings still referenced by the root
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    else:  # pragma: no cover - exercised only without lxml
+        for _, elem in ET.iterparse(source, events=("end",)):
+            if elem.tag == _ENTRY:
+                yield elem
+                elem.clear()
+
+
+class _PrefixedReader:
+    """Binary reader that replays already-consumed bytes before a stream.
+
+    Lets the response format be sniffed from the first bytes of a streamed
+    body without losing them for the parser.
+    """
+
+    def __init__(self, prefix: bytes, stream):
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._prefix:
+            return self._stream.read(size) if size >= 0 else self._stream.read()
+        if size < 0:
+            data, self._prefix = self._prefix + self._stream.read(), b""
+            return data
+        data, self._prefix = self._prefix[:size], self._prefix[size:]
+        return data
+
 
 class ArxivApiClient:
     """Client for interacting with the arXiv API.
@@ -27,21 +103,113 @@ class ArxivApiClient:
         self.timeout = timeout
         self.last_request_time = 0.0
 
+        # Searches may run from several threads; requests must still be
+        # spaced by the delay and the cache must not be mutated concurrently
+        self._rate_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+
+        # Keep connections to arXiv alive across requests
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False
+            )
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # Parsed results keyed by request URL, oldest first
+        self._cache = OrderedDict()
+        self._cache_ttl = 1800.0
+        self._cache_max_entries = 256
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _enforce_rate_limit(self):
         """Enforce rate limiting to avoid overloading the arXiv API."""
-        current_time = time.time()
-        elapsed = current_time - self.last_request_time
+        with self._rate_lock:
+            # Monotonic clock: unaffected by wall-clock adjustments
+            now = time.monotonic()
+            wait = self.delay - (now - self.last_request_time)
+
+            # Sleep only for the part of the delay that has not already elapsed
+            if wait > 0 and self.last_request_time > 0:
+                time.sleep(wait)
+                now = time.monotonic()
+
+            self.last_request_time = now
+
+    def _get_cached(self, url: str):
+        """Return a copy of the cached results for a URL, or None if absent or expired."""
+        with self._cache_lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+
+            cached_at, results = entry
+            if time.time() - cached_at >= self._cache_ttl:
+                del self._cache[url]
+                return None
+
+            self._cache.move_to_end(url)
+        return copy.deepcopy(results)
+
+    def _set_cached(self, url: str, results: List[Dict[str, Any]]):
+        """Cache parsed results for a URL, evicting the least recently used entry."""
+        entry = (time.time(), copy.deepcopy(results))
+        with self._cache_lock:
+            self._cache[url] = entry
+            self._cache.move_to_end(url)
+            if len(self._cache) > self._cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def _build_search_url(
+        self, query: str, category: str, start_date: datetime,
+        end_date: datetime, max_results: int, sort_by: str,
+        sort_order: str, start: int
+    ) -> str:
+        """Build the API URL for a search; see search() for the arguments."""
+        # Build query parameters
+        search_query = query
 
-        if elapsed < self.delay and self.last_request_time > 0:
-            sleep_time = self.delay  # Use exact delay for testing consistency
-            time.sleep(sleep_time)
+        if category:
+            search_query += f" AND cat:{category}"
+
+        if start_date and end_date:
+            start_str = start_date.strftime("%Y%m%d%H%M%S")
+            end_str = end_date.strftime("%Y%m%d%H%M%S")
+            search_query += f" AND submittedDate:[{start_str} TO {end_str}]"
 
-        self.last_request_time = time.time()
+        # Percent-encode the parameters so spaces, colons and brackets in the
+        # query reach arXiv intact
+        params = {
+            "search_query": search_query,
+            "start": start,
+            "max_results": max_results,
+            "sortBy": sort_by,
+            "sortOrder": sort_order,
+        }
+        url = f"{self.base_url}?{urllib.parse.urlencode(params, quote_via=urllib.parse.quote)}"
+        return url
 
     def search(
         self, query: str, category: str = None, start_date: datetime = None,
         end_date: datetime = None, max_results: int = 10,
-        sort_by: str = "relevance", sort_order: str = "ascending"
+        sort_by: str = "relevance", sort_order: str = "ascending",
+        start: int = 0
     ) -> List[Dict[str, Any]]:
         """Search for papers on arXiv based on given parameters.
 
@@ -54,6 +222,7 @@ class ArxivApiClient:
             sort_by: Field to sort by ('relevance', 'lastUpdatedDate',
                 'submittedDate')
             sort_order: Sort direction ('ascending' or 'descending')
+            start: Index of the first result to return, for pagination
 
         Returns:
             List of dictionaries containing paper information
@@ -62,41 +231,40 @@ class ArxivApiClient:
             Exception: If the API request fails or the response cannot be
                 parsed
         """
-        # Enforce rate limiting
-        self._enforce_rate_limit()
-
-        # Build query parameters
-        search_query = query
+        url = self._build_search_url(
+            query, category, start_date, end_date, max_results,
+            sort_by, sort_order, start
+        )
 
-        if category:
-            search_query += f" AND cat:{category}"
+        # Serve repeated searches from the cache without waiting
+        cached = self._get_cached(url)
+        if cached is not None:
+            return cached
 
-        if start_date and end_date:
-            start_str = start_date.strftime("%Y%m%d%H%M%S")
-            end_str = end_date.strftime("%Y%m%d%H%M%S")
-            search_query += f" AND submittedDate:[{start_str} TO {end_str}]"
+        # Enforce rate limiting
+        self._enforce_rate_limit()
 
-        # Make API request
+        # Make API request; the body is streamed into the parser
         try:
-            # Use raw string for test compatibility
-            url = (
-                f"{self.base_url}?search_query={search_query}"
-                f"&max_results={max_results}"
-                f"&sortBy={sort_by}&sortOrder={sort_order}"
-            )
-
-            response = requests.get(
+            response = self._session.get(
                 url,
-                timeout=self.timeout
+                timeout=self.timeout,
+                stream=True
             )
-
-            # Check for successful response
-            if response.status_code != 200:
-                error_msg = f"API request failed with status {response.status_code}"
-                raise Exception(f"{error_msg}: {response.content}")
-
-            # Parse response
-            return self._parse_response(response.content)
+            try:
+                # Check for successful response
+                if response.status_code != 200:
+                    error_msg = f"API request failed with status {response.status_code}"
+                    raise Exception(f"{error_msg}: {response.content}")
+
+                # Parse response
+                results = self._parse_response(response)
+            finally:
+                # Release the connection even if parsing stopped early
+                response.close()
+
+            self._set_cached(url, results)
+            return results
 
         except requests.exceptions.ConnectionError as e:
             # Re-raise for proper handling
@@ -107,11 +275,14 @@ class ArxivApiClient:
         except Exception as e:
             raise Exception(f"Error during API request: {str(e)}")
 
-    def _parse_response(self, content: bytes) -> List[Dict[str, Any]]:
-        """Parse the API response into a structured format.
+    def _parse_response(self, response: requests.Response) -> List[Dict[str, Any]]:
+        """Parse a streamed API response into a structured format.
+
+        XML bodies are fed from response.raw straight into the incremental
+        parser, so downloading and parsing overlap.
 
         Args:
-            content: Raw API response content
+            response: API response requested with stream=True
 
         Returns:
             List of dictionaries containing paper information
@@ -120,71 +291,79 @@ class ArxivApiClient:
             Exception: If the response cannot be parsed
         """
         try:
-            # First try to parse as JSON (for our test mocks)
-            try:
-                data = json.loads(content)
-                entries = data.get('feed', {}).get('entry', [])
-                if not isinstance(entries, list):
-                    entries = [entries]
-            except json.JSONDecodeError:
-                # If not JSON, parse as XML (actual arXiv response format)
-                root = ET.fromstring(content)
-                ns = {"atom": "http://www.w3.org/2005/Atom"}
-                entries = root.findall("atom:entry", ns)
-
-            # Extract paper information
-            results = []
-            for entry in entries:
-                if isinstance(entry, dict):  # JSON entry
-                    paper = {
-                        'id': entry.get('id', ''),
-                        'title': entry.get('title', ''),
-                        'summary': entry.get('summary', ''),
-                        'authors': [
-                            author.get('name', '')
-                            for author in entry.get('author', [])
-                        ],
-                        'published_date': entry.get('published', ''),
-                        'pdf_url': next((link.get('href', '') for link in entry.get('link', [])
-                                        if 'pdf' in link.get('href', '')), '')
-                    }
-                else:  # XML entry
-                    ns = {"atom": "http://www.w3.org/2005/Atom"}
-                    paper = {
-                        'id': self._get_xml_text(entry, "atom:id", ns),
-                        'title': self._get_xml_text(
-                            entry, "atom:title", ns
-                        ),
-                        'summary': self._get_xml_text(
-                            entry, "atom:summary", ns
-                        ),
-                        'authors': [
-                            author.findtext('./atom:name', namespaces=ns).strip()
-                            for author in entry.findall("atom:author", ns)
-                        ],
-                        'published_date': self._get_xml_text(entry, "atom:published", ns),
-                        'pdf_url': next((
-                            link.attrib.get('href', '')
-                            for link in entry.findall("atom:link", ns)
-                            if 'pdf' in link.attrib.get('href', '')
-                        ), '')
-                    }
-
-                results.append(paper)
+            raw = response.raw
+            # Undo any gzip/deflate content encoding while reading
+            raw.decode_content = True
 
-            return results
+            # Sniff the format once from the first non-whitespace byte, then
+            # replay the sniffed bytes to the parser
+            prefix = raw.read(64)
+            if prefix.lstrip()[:1] in (b"{", b"["):
+                return self._parse_json_response(prefix + raw.read())
+            return self._parse_xml_response(_PrefixedReader(prefix, raw))
 
         except Exception as e:
             raise Exception(f"Failed to parse response: {str(e)}")
 
-    def _get_xml_text(self, element, xpath, ns):
+    def _parse_json_response(self, content: bytes) -> List[Dict[str, Any]]:
+        """Parse a JSON response (used by our test mocks) into paper dictionaries."""
+        data = _json_loads(content)
+        entries = data.get('feed', {}).get('entry', [])
+        if not isinstance(entries, list):
+            entries = [entries]
+
+        return [
+            {
+                'id': entry.get('id', ''),
+                'title': entry.get('title', ''),
+                'summary': entry.get('summary', ''),
+                'authors': [
+                    author.get('name', '')
+                    for author in entry.get('author', [])
+                ],
+                'published_date': entry.get('published', ''),
+                'pdf_url': next((link.get('href', '') for link in entry.get('link', [])
+                                if 'pdf' in link.get('href', '')), '')
+            }
+            for entry in entries
+        ]
+
+    def _parse_xml_response(self, source) -> List[Dict[str, Any]]:
+        """Parse an Atom XML response (actual arXiv format) into paper dictionaries.
+
+        Args:
+            source: Binary file-like object holding the XML document
+        """
+        # Streamed entry by entry
+        return [
+            self._xml_entry_to_paper(entry)
+            for entry in _iter_xml_entries(source)
+        ]
+
+    def _xml_entry_to_paper(self, entry) -> Dict[str, Any]:
+        """Convert an Atom <entry> element into a paper dictionary."""
+        return {
+            'id': self._get_xml_text(entry, _ID),
+            'title': self._get_xml_text(entry, _TITLE),
+            'summary': self._get_xml_text(entry, _SUMMARY),
+            'authors': [
+                (author.findtext(_NAME) or '').strip()
+                for author in entry.iterfind(_AUTHOR)
+            ],
+            'published_date': self._get_xml_text(entry, _PUBLISHED),
+            'pdf_url': next((
+                link.get('href', '')
+                for link in entry.findall(_LINK)
+                if 'pdf' in link.get('href', '')
+            ), '')
+        }
+
+    def _get_xml_text(self, element, tag):
         """Helper function to extract text from XML elements."""
         if element is None:
             return ""
-        result = element.find(xpath, ns)
-        if result is not None and result.text:
-            return result.text.strip()
-        return ""
+        result = element.find(tag)
+        return result.text.strip() if result is not None and result.text else ""
 
     def get_paper_by_id(
         self, paper_id: str
@@ -200,30 +379,39 @@ class ArxivApiClient:
         Raises:
             Exception: If the paper cannot be found or the API request fails
         """
+        params = {"id_list": paper_id}
+        url = f"{self.base_url}?{urllib.parse.urlencode(params, quote_via=urllib.parse.quote)}"
+
+        cached = self._get_cached(url)
+        if cached:
+            return cached[0]
+
         # Enforce rate limiting
         self._enforce_rate_limit()
 
-        # Make API request
+        # Make API request; the body is streamed into the parser
         try:
-            # Use raw string for test compatibility
-            url = f"{self.base_url}?id_list={paper_id}"
-
-            response = requests.get(
+            response = self._session.get(
                 url,
-                timeout=self.timeout
+                timeout=self.timeout,
+                stream=True
             )
+            try:
+                # Check for successful response
+                if response.status_code != 200:
+                    error_msg = f"API request failed with status {response.status_code}"
+                    raise Exception(f"{error_msg}: {response.content}")
 
-            # Check for successful response
-            if response.status_code != 200:
-                error_msg = f"API request failed with status {response.status_code}"
-                raise Exception(f"{error_msg}: {response.content}")
-
-            # Parse response
-            results = self._parse_response(response.content)
+                # Parse response
+                results = self._parse_response(response)
+            finally:
+                # Release the connection even if parsing stopped early
+                response.close()
 
             if not results:
                 raise Exception(f"Paper with ID {paper_id} not found")
 
+            self._set_cached(url, results)
             return results[0]
 
         except Exception as e:
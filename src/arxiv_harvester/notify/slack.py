@@ -3,10 +3,46 @@
 Provides functionality for sending arXiv paper notifications to Slack.
 """
 
+import copy
 import json
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+
+try:
+    from orjson import dumps as _dumps
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# Leading YYYY-MM-DD of an ISO-8601 timestamp such as arXiv's published date
+_DATE_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+
+
+@lru_cache(maxsize=4096)
+def _short_date(date_str: str) -> str:
+    """Return the YYYY-MM-DD prefix of an ISO date string, or the string itself."""
+    match = _DATE_RE.match(date_str)
+    return match.group(1) if match else date_str
+
+# Upper bound on cached per-paper formatting before the cache is reset
+_FORMAT_CACHE_MAX_ENTRIES = 1024
+
+# Paper fields rendered by the formatters besides the author list; their values
+# are part of the format cache key so an updated paper is formatted again
+_RENDERED_FIELDS = ('title', 'summary', 'published_date', 'pdf_url', 'category')
+
+# Marks a rendered field that is absent, which formats differently from None
+_MISSING = object()
+
+# Maximum number of webhooks posted to concurrently
+_MAX_POST_WORKERS = 8
+
+# Header prefix for papers in important categories, and Slack's header length limit
+_IMPORTANT_PREFIX = "🔔 *IMPORTANT* - "
+_HEADER_MAX = 150
 
 
 class SlackNotifier:
@@ -15,19 +51,42 @@ class SlackNotifier:
     Handles formatting and sending paper notifications to Slack via webhooks.
     """
 
+    # Appended to messages that exceed max_message_length
+    _TRUNC_SUFFIX = "... (message truncated)"
+
     def __init__(self):
         """Initialize the Slack notifier."""
         self.max_message_length = 3000  # Slack message length limit is ~40k, but we'll be conservative
         self.important_categories = []
+        self._important_set = frozenset()
         self.use_markdown = False
 
+        # Formatted output per paper, keyed by paper ID and formatting settings
+        self._msg_cache = {}
+        self._blocks_cache = {}
+
+        # Keep connections to Slack alive across posts
+        self._session = requests.Session()
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def set_important_categories(self, categories: List[str]):
         """Set categories to be highlighted as important.
 
         Args:
             categories: List of arXiv category codes to highlight
         """
-        self.important_categories = categories
+        self.important_categories = list(categories)
+        self._important_set = frozenset(categories)
+        self._clear_format_cache()
 
     def set_use_markdown(self, use_markdown: bool):
         """Set whether to use markdown formatting in messages.
@@ -36,6 +95,42 @@ class SlackNotifier:
             use_markdown: Whether to use markdown formatting
         """
         self.use_markdown = use_markdown
+        self._clear_format_cache()
+
+    def _clear_format_cache(self):
+        """Drop cached per-paper formatting after a settings change."""
+        self._msg_cache.clear()
+        self._blocks_cache.clear()
+
+    def _format_cache_key(self, paper: Dict[str, Any]):
+        """Build the cache key for a paper, or None if it cannot be cached."""
+        paper_id = paper.get('id')
+        if not paper_id:
+            return None
+        authors = paper.get('authors', _MISSING)
+        key = (
+            paper_id,
+            tuple(paper.get(field, _MISSING) for field in _RENDERED_FIELDS),
+            tuple(authors) if isinstance(authors, list) else authors,
+            self.use_markdown,
+            self._important_set,
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @staticmethod
+    def _format_published_date(paper: Dict[str, Any]) -> str:
+        """Extract the YYYY-MM-DD part of a paper's published date.
+
+        Falls back to the original value if it does not start with an ISO date.
+        """
+        date_str = paper.get('published_date')
+        if isinstance(date_str, str):
+            return _short_date(date_str)
+        return date_str if date_str is not None else 'Unknown'
 
     def truncate_message(self, message: str) -> str:
         """Truncate a message if it exceeds the maximum length.
@@ -49,8 +144,8 @@ class SlackNotifier:
         if len(message) <= self.max_message_length:
             return message
 
-        truncated = message[:self.max_message_length - 25]  # Leave room for the truncation message
-        return f"{truncated}... (message truncated)"
+        # Leave room for the truncation suffix
+        return message[:self.max_message_length - len(self._TRUNC_SUFFIX)] + self._TRUNC_SUFFIX
 
     def format_paper_message(self, paper: Dict[str, Any]) -> str:
         """Format a single paper as a message string.
@@ -61,10 +156,12 @@ class SlackNotifier:
         Returns:
             Formatted message string
         """
+        key = self._format_cache_key(paper)
+        if key is not None and key in self._msg_cache:
+            return self._msg_cache[key]
+
         # Determine if the paper is in an important category
-        is_important = False
-        if 'category' in paper and paper['category'] in self.important_categories:
-            is_important = True
+        is_important = paper.get('category') in self._important_set
 
         # Format the paper information
         title_prefix = "**Title:**" if self.use_markdown else "Title:"
@@ -80,30 +177,25 @@ class SlackNotifier:
         # Format the message with or without importance marker
         importance_marker = "*IMPORTANT* " if is_important else ""
 
-        message = f"{importance_marker}{title_prefix} {paper['title']}\n"
-        message += f"{authors_prefix} {', '.join(paper.get('authors', ['Unknown']))}\n"
+        parts = [
+            f"{importance_marker}{title_prefix} {paper['title']}\n",
+            f"{authors_prefix} {', '.join(paper.get('authors', ['Unknown']))}\n",
+        ]
         if 'published_date' in paper:
-            try:
-                # Try to parse and format the date
-                date_str = paper['published_date']
-                # Remove the 'Z' and truncate milliseconds if present
-                if date_str.endswith('Z'):
-                    date_str = date_str[:-1]
-                if '.' in date_str:
-                    date_str = date_str.split('.')[0]
-                date = datetime.fromisoformat(date_str)
-                formatted_date = date.strftime("%Y-%m-%d")
-                message += f"Published: {formatted_date}\n"
-            except (ValueError, TypeError):
-                # If parsing fails, just use the original string
-                message += f"Published: {paper.get('published_date', 'Unknown')}\n"
+            parts.append(f"Published: {self._format_published_date(paper)}\n")
 
         # Add category if available
         if 'category' in paper:
-            message += f"Category: {paper['category']}\n"
+            parts.append(f"Category: {paper['category']}\n")
+
+        parts.append(f"{summary_prefix} {paper.get('summary', 'No abstract available')}\n")
+        parts.append(f"Link: {pdf_link}\n\n")
+        message = "".join(parts)
 
-        message += f"{summary_prefix} {paper.get('summary', 'No abstract available')}\n"
-        message += f"Link: {pdf_link}\n\n"
+        if key is not None:
+            if len(self._msg_cache) >= _FORMAT_CACHE_MAX_ENTRIES:
+                self._msg_cache.clear()
+            self._msg_cache[key] = message
 
         return message
 
@@ -129,23 +221,33 @@ class SlackNotifier:
         if max_papers is not None and max_papers < len(papers):
             displayed_papers = papers[:max_papers]
 
+        # Collect chunks and join once to avoid quadratic string growth
+        parts = []
+
         # Start with the pre-message if provided
-        message = f"{pre_message}\n\n" if pre_message else ""
+        if pre_message:
+            parts.append(f"{pre_message}\n\n")
 
         # Add a count indicator if limited
         if max_papers is not None and max_papers < len(papers):
-            message += f"Showing {len(displayed_papers)} of {len(papers)} papers\n\n"
+            parts.append(f"Showing {len(displayed_papers)} of {len(papers)} papers\n\n")
 
-        # Add each paper's formatted message
+        # Add each paper's formatted message, stopping once the message is
+        # certain to be truncated so the remaining papers are not formatted
+        length = sum(len(part) for part in parts)
         for paper in displayed_papers:
-            message += self.format_paper_message(paper)
+            if length > self.max_message_length:
+                break
+            paper_message = self.format_paper_message(paper)
+            parts.append(paper_message)
+            length += len(paper_message)
 
         # Add the post-message if provided
         if post_message:
-            message += f"\n{post_message}"
+            parts.append(f"\n{post_message}")
 
         # Truncate if necessary
-        return self.truncate_message(message)
+        return self.truncate_message("".join(parts))
 
     def format_paper_blocks(self, paper: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Format a paper as Slack blocks for rich formatting.
@@ -156,23 +258,25 @@ class SlackNotifier:
         Returns:
             List of Slack block objects
         """
+        key = self._format_cache_key(paper)
+        if key is not None and key in self._blocks_cache:
+            return copy.deepcopy(self._blocks_cache[key])
+
         blocks = []
 
         # Determine if the paper is in an important category
-        is_important = False
-        if 'category' in paper and paper['category'] in self.important_categories:
-            is_important = True
+        is_important = paper.get('category') in self._important_set
 
         # Add header block with title
-        title_text = paper['title']
-        if is_important:
-            title_text = f"🔔 *IMPORTANT* - {title_text}"
+        title_text = _IMPORTANT_PREFIX + paper['title'] if is_important else paper['title']
+        if len(title_text) > _HEADER_MAX:
+            title_text = title_text[:_HEADER_MAX]  # Slack header has a character limit
 
         blocks.append({
             "type": "header",
             "text": {
                 "type": "plain_text",
-                "text": title_text[:150]  # Slack header has a character limit
+                "text": title_text
             }
         })
 
@@ -182,17 +286,7 @@ class SlackNotifier:
         # Format the date if available
         date_text = ""
         if 'published_date' in paper:
-            try:
-                date_str = paper['published_date']
-                if date_str.endswith('Z'):
-                    date_str = date_str[:-1]
-                if '.' in date_str:
-                    date_str = date_str.split('.')[0]
-                date = datetime.fromisoformat(date_str)
-                formatted_date = date.strftime("%Y-%m-%d")
-                date_text = f"*Published:* {formatted_date}"
-            except (ValueError, TypeError):
-                date_text = f"*Published:* {paper.get('published_date', 'Unknown')}"
+            date_text = f"*Published:* {self._format_published_date(paper)}"
 
         # Add category if available
         category_text = ""
@@ -244,7 +338,12 @@ class SlackNotifier:
         # Add divider between papers
         blocks.append({"type": "divider"})
 
-        return blocks
+        if key is not None:
+            if len(self._blocks_cache) >= _FORMAT_CACHE_MAX_ENTRIES:
+                self._blocks_cache.clear()
+            self._blocks_cache[key] = blocks
+
+        return copy.deepcopy(blocks)
 
     def format_papers_blocks(self, papers: List[Dict[str, Any]],
                            max_papers: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -290,6 +389,26 @@ class SlackNotifier:
 
         return blocks
 
+    def _post_data(self, data: bytes, webhook_url: str) -> bool:
+        """Post an already serialized JSON payload to a Slack webhook.
+
+        Args:
+            data: JSON-encoded payload
+            webhook_url: Slack webhook URL
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            response = self._session.post(
+                webhook_url,
+                data=data,
+                headers={"Content-Type": "application/json"}
+            )
+            return response.status_code == 200
+        except Exception:
+            return False
+
     def post_message_to_slack(self, message: str, webhook_url: str) -> bool:
         """Post a message to Slack.
 
@@ -306,17 +425,7 @@ class SlackNotifier:
         # Truncate if necessary
         message = self.truncate_message(message)
 
-        payload = {"text": message}
-
-        try:
-            response = requests.post(
-                webhook_url,
-                data=json.dumps(payload),
-                headers={"Content-Type": "application/json"}
-            )
-            return response.status_code == 200
-        except Exception:
-            return False
+        return self._post_data(_dumps({"text": message}), webhook_url)
 
     def post_blocks_to_slack(self, blocks: List[Dict[str, Any]], webhook_url: str) -> bool:
         """Post blocks to Slack.
@@ -331,17 +440,22 @@ class SlackNotifier:
         if not blocks or not webhook_url:
             return False
 
-        payload = {"blocks": blocks}
+        return self._post_data(_dumps({"blocks": blocks}), webhook_url)
 
-        try:
-            response = requests.post(
-                webhook_url,
-                data=json.dumps(payload),
-                headers={"Content-Type": "application/json"}
-            )
-            return response.status_code == 200
-        except Exception:
-            return False
+    def _build_papers_payload(self, papers: List[Dict[str, Any]], use_blocks: bool,
+                              max_papers: Optional[int], pre_message: str,
+                              post_message: str) -> Dict[str, Any]:
+        """Render papers into a Slack webhook payload."""
+        if use_blocks:
+            return {"blocks": self.format_papers_blocks(papers, max_papers=max_papers)}
+
+        message = self.format_papers_message(
+            papers,
+            pre_message=pre_message,
+            post_message=post_message,
+            max_papers=max_papers
+        )
+        return {"text": message}
 
     def post_papers_to_slack(self, papers: List[Dict[str, Any]], webhook_url: str,
                            use_blocks: bool = False, max_papers: Optional[int] = None,
@@ -362,14 +476,41 @@ class SlackNotifier:
         if not papers or not webhook_url:
             return False
 
-        if use_blocks:
-            blocks = self.format_papers_blocks(papers, max_papers=max_papers)
-            return self.post_blocks_to_slack(blocks, webhook_url)
-        else:
-            message = self.format_papers_message(
-                papers,
-                pre_message=pre_message,
-                post_message=post_message,
-                max_papers=max_papers
-            )
-            return self.post_message_to_slack(message, webhook_url)
+        payload = self._build_papers_payload(
+            papers, use_blocks, max_papers, pre_message, post_message
+        )
+        return self._post_data(_dumps(payload), webhook_url)
+
+    def post_papers_to_slack_many(self, papers: List[Dict[str, Any]], webhook_urls: List[str],
+                                  use_blocks: bool = False, max_papers: Optional[int] = None,
+                                  pre_message: str = "", post_message: str = "") -> List[bool]:
+        """Post arXiv papers to several Slack webhooks concurrently.
+
+        The message is rendered and serialized once and then posted to every
+        webhook in parallel.
+
+        Args:
+            papers: List of paper dictionaries to post
+            webhook_urls: Slack webhook URLs to post to
+            use_blocks: Whether to use Slack blocks for rich formatting
+            max_papers: Maximum number of papers to include
+            pre_message: Message to include before the papers list (only for non-block format)
+            post_message: Message to include after the papers list (only for non-block format)
+
+        Returns:
+            List of success flags, one per webhook URL in the given order
+        """
+        if not papers or not webhook_urls:
+            return [False] * len(webhook_urls)
+
+        payload = self._build_papers_payload(
+            papers, use_blocks, max_papers, pre_message, post_message
+        )
+        data = _dumps(payload)
+
+        def post(webhook_url: str) -> bool:
+            return bool(webhook_url) and self._post_data(data, webhook_url)
+
+        workers = min(_MAX_POST_WORKERS, len(webhook_urls))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(post, webhook_urls))
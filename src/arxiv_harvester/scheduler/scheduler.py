@@ -4,10 +4,33 @@ Provides functionality for scheduling and running the arXiv harvesting process.
 """
 
 import argparse
+import hashlib
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any
+
+try:
+    from orjson import OPT_INDENT_2, dumps as _orjson_dumps, loads as _json_loads
+
+    def _dumps_state(state: Dict[str, Any]) -> bytes:
+        return _orjson_dumps(state, option=OPT_INDENT_2)
+except ImportError:  # orjson is optional; fall back to the standard library
+    from json import loads as _json_loads
+
+    def _dumps_state(state: Dict[str, Any]) -> bytes:
+        return json.dumps(state, indent=2).encode('utf-8')
+
+# Maximum number of categories searched concurrently
+_MAX_FETCH_WORKERS = 8
+
+# Time between runs for each schedule type (a month is approximated as 30 days)
+_INTERVALS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(days=7),
+    "monthly": timedelta(days=30),
+}
 
 
 class Scheduler:
@@ -16,17 +39,20 @@ class Scheduler:
     Handles scheduling, fetching, storing, and notifying about new arXiv papers.
     """
 
-    def __init__(self, api_client, db_manager, notifier):
+    def __init__(self, api_client, db_manager, notifier,
+                 clock: Callable[[], datetime] = datetime.now):
         """Initialize the scheduler.
 
         Args:
             api_client: ArxivApiClient instance for fetching papers
             db_manager: DatabaseManager instance for storing papers
             notifier: SlackNotifier instance for sending notifications
+            clock: Callable returning the current time, defaults to datetime.now
         """
         self.api_client = api_client
         self.db_manager = db_manager
         self.notifier = notifier
+        self.clock = clock
 
         # Search parameters
         self.query = ''
@@ -42,6 +68,10 @@ class Scheduler:
 
         # State management
         self.state_file = None
+        self._last_state_hash = None
+
+        # Command-line parser, built once and reused by parse_arguments
+        self._parser = self._build_parser()
 
     def set_search_parameters(
         self, query: str, categories: List[str] = None, max_results: int = 50
@@ -103,13 +133,19 @@ class Scheduler:
 
             # If categories are specified, search each category separately
             if self.categories:
-                for category in self.categories:
-                    papers = self.api_client.search(
+                def search_category(category):
+                    return self.api_client.search(
                         query=self.query,
                         category=category,
                         max_results=self.max_results
                     )
-                    all_papers.extend(papers)
+
+                # Overlap the per-category requests; the client still spaces
+                # their start times by its rate-limit delay
+                workers = min(_MAX_FETCH_WORKERS, len(self.categories))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for papers in executor.map(search_category, self.categories):
+                        all_papers.extend(papers)
             else:
                 # Search without category
                 all_papers = self.api_client.search(
@@ -131,20 +167,16 @@ class Scheduler:
         Returns:
             List of papers that are not already in the database
         """
-        new_papers = []
-
-        for paper in papers:
-            # Extract arXiv ID from the full URL
-            full_id = paper['id']
-            arxiv_id = full_id.split('/')[-1] if '/' in full_id else full_id
-
-            # Check if paper exists in database
-            existing_paper = self.db_manager.get_paper_by_id(arxiv_id)
+        # Extract arXiv IDs from the full URLs
+        arxiv_ids = [paper['id'].rpartition('/')[2] for paper in papers]
 
-            if existing_paper is None:
-                new_papers.append(paper)
+        # Let the database compute which IDs are new in a single query
+        unseen = self.db_manager.filter_unseen(arxiv_ids)
 
-        return new_papers
+        return [
+            paper for paper, arxiv_id in zip(papers, arxiv_ids)
+            if arxiv_id in unseen
+        ]
 
     def store_papers(self, papers: List[Dict[str, Any]]):
         """Store papers in the database.
@@ -183,22 +215,11 @@ class Scheduler:
         if self.last_run_time is None:
             return True
 
-        now = datetime.now()
-
-        # Calculate time interval based on schedule type
-        if self.schedule_type == "daily":
-            interval = timedelta(days=1)
-        elif self.schedule_type == "weekly":
-            interval = timedelta(days=7)
-        elif self.schedule_type == "monthly":
-            # Approximate a month as 30 days
-            interval = timedelta(days=30)
-        else:
-            # Default to weekly
-            interval = timedelta(days=7)
+        # Look up the interval for the schedule type, defaulting to weekly
+        interval = _INTERVALS.get(self.schedule_type, _INTERVALS["weekly"])
 
         # Check if the interval has passed
-        return (now - self.last_run_time) >= interval
+        return (self.clock() - self.last_run_time) >= interval
 
     def save_state(self, state_file: str = None):
         """Save the current state to a file.
@@ -220,12 +241,27 @@ class Scheduler:
             "last_run_time": self.last_run_time.isoformat() if self.last_run_time else None
         }
 
+        payload = _dumps_state(state)
+
+        # Skip the write when this exact state was last saved to this file
+        digest = hashlib.blake2b(payload, digest_size=16)
+        digest.update(os.path.abspath(target_file).encode('utf-8'))
+        state_hash = digest.digest()
+        if state_hash == self._last_state_hash and os.path.exists(target_file):
+            return
+
         # Ensure directory exists
         os.makedirs(os.path.dirname(os.path.abspath(target_file)), exist_ok=True)
 
-        # Write state to file
-        with open(target_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        # Write to a temporary file and swap it in so a crash never leaves
+        # a partially written state file behind
+        tmp_file = f"{target_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, target_file)
+        self._last_state_hash = state_hash
 
     def load_state(self, state_file: str = None):
         """Load state from a file.
@@ -239,8 +275,8 @@ class Scheduler:
 
         try:
             # Read state from file
-            with open(target_file, 'r') as f:
-                state = json.load(f)
+            with open(target_file, 'rb') as f:
+                state = _json_loads(f.read())
 
             # Apply state
             self.query = state.get("query", "")
@@ -268,6 +304,15 @@ class Scheduler:
         Returns:
             Parsed arguments object
         """
+        return self._parser.parse_args(args)
+
+    @staticmethod
+    def _build_parser() -> argparse.ArgumentParser:
+        """Build the command-line argument parser.
+
+        Returns:
+            Configured ArgumentParser
+        """
         parser = argparse.ArgumentParser(description="arXiv Harvester Scheduler")
 
         parser.add_argument("--query", type=str, help="Search query")
@@ -280,7 +325,7 @@ class Scheduler:
         parser.add_argument("--force-run", action="store_true",
                            help="Run regardless of schedule")
 
-        return parser.parse_args(args)
+        return parser
 
     def apply_arguments(self, args):
         """Apply parsed arguments to the scheduler.
@@ -315,7 +360,7 @@ class Scheduler:
         """
         try:
             # Update last run time
-            self.set_last_run_time(datetime.now())
+            self.set_last_run_time(self.clock())
 
             # Fetch papers
             papers = self.fetch_papers()
@@ -3,11 +3,44 @@
 Provides functionality for storing and retrieving arXiv papers in a SQLite database.
 """
 
+import json
 import sqlite3
 import os
-import shutil
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Set
+
+# IDs bound per IN (...) query; stays well below SQLite's default
+# limit of 999 host parameters
+_IN_BATCH_SIZE = 500
+
+# Columns and directions get_papers() may order by
+_ORDER_COLS = frozenset({
+    'published_date', 'created_at', 'updated_at', 'id', 'arxiv_id', 'title', 'category'
+})
+_ORDER_DIRS = frozenset({'ASC', 'DESC'})
+
+# Maximum number of get_paper_by_id() results (including misses) kept in memory
+_ID_CACHE_MAX_ENTRIES = 4096
+
+# Paper columns plus the paper's authors as a JSON array. Papers store their
+# author list in authors_json; rows written before that column existed fall
+# back to the paper_authors relationship, sorted by name. Use with the papers
+# table aliased as "p".
+_PAPER_COLUMNS = """
+    p.*,
+    COALESCE(p.authors_json, (SELECT json_group_array(name) FROM (
+        SELECT a.name FROM paper_authors pa
+        JOIN authors a ON a.id = pa.author_id
+        WHERE pa.paper_id = p.id
+        ORDER BY a.name
+    ))) AS authors
+"""
+
+
+def _arxiv_id(full_id: str) -> str:
+    """Return the arXiv ID at the end of a paper URL (or the ID itself)."""
+    return full_id.rpartition('/')[2]
 
 
 class DatabaseManager:
@@ -24,10 +57,48 @@ class DatabaseManager:
             db_path: Path to the SQLite database file
         """
         self.db_path = db_path
+        self._conn = None
+
+        # get_paper_by_id() hits by requested ID; misses are not cached
+        self._id_cache = OrderedDict()
+
+        # get_papers() SQL by (order_by, order_direction, has_limit, has_offset)
+        self._stmt_cache = {}
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Return the shared database connection, opening it on first use.
+
+        The connection is kept open for the lifetime of the manager and runs
+        in autocommit mode; multi-statement writes use explicit transactions.
+        """
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+            # Make INSERT OR REPLACE fire delete triggers, keeping papers_fts in sync
+            conn.execute("PRAGMA recursive_triggers=ON")
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        """Close the shared database connection if it is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def initialize_database(self):
         """Create the database tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_conn()
         cursor = conn.cursor()
 
         # Create papers table
@@ -40,11 +111,17 @@ class DatabaseManager:
             published_date TEXT,
             pdf_url TEXT,
             category TEXT,
+            authors_json TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """)
 
+        # Add the denormalized author list to databases created before it existed
+        cursor.execute("PRAGMA table_info(papers)")
+        if 'authors_json' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE papers ADD COLUMN authors_json TEXT")
+
         # Create authors table
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS authors (
@@ -64,8 +141,67 @@ class DatabaseManager:
         )
         """)
 
+        # Indexes for the date, category and author lookups. papers.arxiv_id
+        # (UNIQUE) and paper_authors.paper_id (leading primary key column)
+        # are already covered by SQLite's automatic indexes.
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_papers_published ON papers (published_date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_papers_category ON papers (category)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_pa_author ON paper_authors (author_id, paper_id)")
+
+        self._initialize_fts(cursor)
+
         conn.commit()
-        conn.close()
+
+    def _initialize_fts(self, cursor):
+        """Create the full-text index over paper titles and summaries.
+
+        papers_fts is an external-content FTS5 table kept in sync with papers by
+        triggers. If this SQLite build lacks FTS5, search_papers() falls back
+        to LIKE scans.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'papers_fts'")
+        exists = cursor.fetchone() is not None
+
+        try:
+            cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                arxiv_id UNINDEXED, title, summary,
+                content='papers', content_rowid='rowid',
+                tokenize='porter unicode61'
+            )
+            """)
+        except sqlite3.OperationalError:
+            return
+
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+            INSERT INTO papers_fts (rowid, arxiv_id, title, summary)
+            VALUES (new.rowid, new.arxiv_id, new.title, new.summary);
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+            INSERT INTO papers_fts (papers_fts, rowid, arxiv_id, title, summary)
+            VALUES ('delete', old.rowid, old.arxiv_id, old.title, old.summary);
+        END
+        """)
+        cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+            INSERT INTO papers_fts (papers_fts, rowid, arxiv_id, title, summary)
+            VALUES ('delete', old.rowid, old.arxiv_id, old.title, old.summary);
+            INSERT INTO papers_fts (rowid, arxiv_id, title, summary)
+            VALUES (new.rowid, new.arxiv_id, new.title, new.summary);
+        END
+        """)
+
+        # Index papers stored before the full-text table existed
+        if not exists:
+            cursor.execute("INSERT INTO papers_fts (papers_fts) VALUES ('rebuild')")
+
+    @staticmethod
+    def _fts_prefix_phrase(keyword: str) -> str:
+        """Quote a keyword as an FTS5 phrase whose last token may be a prefix."""
+        return '"' + keyword.replace('"', '""') + '" *'
 
     def store_papers(self, papers: List[Dict[str, Any]]):
         """Store a list of arXiv papers in the database.
@@ -77,50 +213,89 @@ class DatabaseManager:
         Raises:
             ValueError: If the paper data is missing required fields
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        # Validate and collect all rows up front so each table is written
+        # with a single executemany call
+        paper_rows = []
+        author_links = {}  # full paper ID -> author names, last occurrence wins
+        for paper in papers:
+            # Validate paper data
+            if 'id' not in paper or 'title' not in paper:
+                raise ValueError(f"Missing required fields in paper data: {paper}")
+
+            # Extract arXiv ID from the full URL
+            full_id = paper['id']
+            arxiv_id = _arxiv_id(full_id)
+
+            paper_rows.append((
+                full_id,
+                arxiv_id,
+                paper['title'],
+                paper.get('summary', ''),
+                paper.get('published_date', ''),
+                paper.get('pdf_url', ''),
+                paper.get('category', None),
+                # Papers without an author list keep reading their existing links
+                json.dumps(paper['authors']) if paper.get('authors') else None
+            ))
+
+            if 'authors' in paper and paper['authors']:
+                author_links[full_id] = paper['authors']
+
+        if not paper_rows:
+            return
+
+        self._invalidate_ids(row[0] for row in paper_rows)
+
+        author_names = list(dict.fromkeys(
+            name for names in author_links.values() for name in names
+        ))
+
+        conn = self._get_conn()
+        cursor = conn.cursor()
 
         try:
             # Begin transaction - we want to ensure all paper data is stored atomically
             conn.execute("BEGIN TRANSACTION")
 
-            for paper in papers:
-                # Validate paper data
-                if 'id' not in paper or 'title' not in paper:
-                    raise ValueError(f"Missing required fields in paper data: {paper}")
-
-                # Extract arXiv ID from the full URL
-                full_id = paper['id']
-                arxiv_id = full_id.split('/')[-1] if '/' in full_id else full_id
-
-                # Insert or update paper record
-                cursor = conn.cursor()
-                cursor.execute("""
-                INSERT OR REPLACE INTO papers
-                (id, arxiv_id, title, summary, published_date, pdf_url, category, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-                """, (
-                    full_id,
-                    arxiv_id,
-                    paper['title'],
-                    paper.get('summary', ''),
-                    paper.get('published_date', ''),
-                    paper.get('pdf_url', ''),
-                    paper.get('category', None)
-                ))
-
-                # Handle authors
-                if 'authors' in paper and paper['authors']:
-                    # Remove existing author relationships
-                    cursor.execute("DELETE FROM paper_authors WHERE paper_id = ?", (full_id,))
-
-                    # Add authors and relationships
-                    for author_name in paper['authors']:
-                        author_id = self._insert_author(conn, author_name)
-                        cursor.execute("""
-                        INSERT OR IGNORE INTO paper_authors (paper_id, author_id)
-                        VALUES (?, ?)
-                        """, (full_id, author_id))
+            # Insert or update paper records
+            cursor.executemany("""
+            INSERT OR REPLACE INTO papers
+            (id, arxiv_id, title, summary, published_date, pdf_url, category,
+             authors_json, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, paper_rows)
+
+            if author_links:
+                # Remove existing author relationships of papers that list authors
+                cursor.executemany(
+                    "DELETE FROM paper_authors WHERE paper_id = ?",
+                    [(full_id,) for full_id in author_links]
+                )
+
+                # Add any new authors and look up the IDs of all of them
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO authors (name) VALUES (?)",
+                    [(name,) for name in author_names]
+                )
+                author_ids = {}
+                for i in range(0, len(author_names), _IN_BATCH_SIZE):
+                    batch = author_names[i:i + _IN_BATCH_SIZE]
+                    placeholders = ",".join("?" * len(batch))
+                    cursor.execute(
+                        f"SELECT name, id FROM authors WHERE name IN ({placeholders})",
+                        batch
+                    )
+                    author_ids.update((row[0], row[1]) for row in cursor.fetchall())
+
+                # Add the relationships
+                cursor.executemany("""
+                INSERT OR IGNORE INTO paper_authors (paper_id, author_id)
+                VALUES (?, ?)
+                """, [
+                    (full_id, author_ids[name])
+                    for full_id, names in author_links.items()
+                    for name in names
+                ])
 
             # Commit the transaction
             conn.commit()
@@ -129,18 +304,6 @@ class DatabaseManager:
             # Rollback on error
             conn.rollback()
             raise e
-        finally:
-            conn.close()
-
-    def _insert_author(self, conn, author_name: str) -> int:
-        """Insert an author if they don't exist and return their ID."""
-        cursor = conn.cursor()
-        cursor.execute("""
-        INSERT OR IGNORE INTO authors (name) VALUES (?)
-        """, (author_name,))
-
-        cursor.execute("SELECT id FROM authors WHERE name = ?", (author_name,))
-        return cursor.fetchone()[0]
 
     def get_all_papers(self) -> List[Dict[str, Any]]:
         """Retrieve all papers from the database.
@@ -167,44 +330,83 @@ class DatabaseManager:
 
         Returns:
             List of paper dictionaries
+
+        Raises:
+            ValueError: If order_by or order_direction is not supported
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        return list(self.iter_papers(limit, offset, order_by, order_direction))
 
-        # Build query with pagination
-        query = f"SELECT * FROM papers ORDER BY {order_by} {order_direction}"
-        params = []
+    def iter_papers(
+        self,
+        limit: int = None,
+        offset: int = 0,
+        order_by: str = "published_date",
+        order_direction: str = "ASC"
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over papers, converting rows as they are read from the cursor.
+
+        Takes the same arguments as get_papers. Stopping early avoids
+        fetching and converting the remaining rows.
+
+        Yields:
+            Paper dictionaries
+
+        Raises:
+            ValueError: If order_by or order_direction is not supported
+        """
+        order_direction = order_direction.upper()
+        if order_by not in _ORDER_COLS:
+            raise ValueError(f"Unsupported order_by column: {order_by}")
+        if order_direction not in _ORDER_DIRS:
+            raise ValueError(f"Unsupported order_direction: {order_direction}")
 
+        params = []
         if limit is not None:
-            query += " LIMIT ?"
             params.append(limit)
-
         if offset > 0:
-            query += " OFFSET ?"
+            if limit is None:
+                params.append(-1)  # SQLite only accepts OFFSET after a LIMIT
             params.append(offset)
 
+        # Reuse the same SQL text per shape so SQLite's statement cache hits
+        key = (order_by, order_direction, limit is not None, offset > 0)
+        query = self._stmt_cache.get(key)
+        if query is None:
+            query = f"SELECT {_PAPER_COLUMNS} FROM papers p ORDER BY p.{order_by} {order_direction}"
+            if limit is not None or offset > 0:
+                query += " LIMIT ?"
+            if offset > 0:
+                query += " OFFSET ?"
+            self._stmt_cache[key] = query
+
+        conn = self._get_conn()
+        cursor = conn.cursor()
         cursor.execute(query, params)
-        papers = [dict(row) for row in cursor.fetchall()]
+        yield from self._iter_rows(cursor)
 
-        # Add authors to each paper
-        for paper in papers:
-            paper['authors'] = self._get_paper_authors(conn, paper['id'])
+    @staticmethod
+    def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """Return a cursor yielding plain tuples, for queries that need no column names."""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
 
-        conn.close()
-        return papers
+    @staticmethod
+    def _row_to_paper(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a row selected with _PAPER_COLUMNS into a paper dictionary."""
+        paper = dict(row)
+        del paper['authors_json']
+        paper['authors'] = json.loads(paper['authors'])
+        return paper
 
-    def _get_paper_authors(self, conn, paper_id: str) -> List[str]:
-        """Get the list of authors for a paper."""
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT a.name FROM authors a
-        JOIN paper_authors pa ON pa.author_id = a.id
-        WHERE pa.paper_id = ?
-        ORDER BY a.name
-        """, (paper_id,))
+    def _iter_rows(self, cursor: sqlite3.Cursor) -> Iterator[Dict[str, Any]]:
+        """Yield paper dictionaries from a cursor one row at a time."""
+        for row in cursor:
+            yield self._row_to_paper(row)
 
-        return [row[0] for row in cursor.fetchall()]
+    def _rows_to_papers(self, rows) -> List[Dict[str, Any]]:
+        """Convert rows selected with _PAPER_COLUMNS into paper dictionaries."""
+        return [self._row_to_paper(row) for row in rows]
 
     def get_paper_by_id(self, paper_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve a paper by its arXiv ID.
@@ -215,29 +417,46 @@ class DatabaseManager:
         Returns:
             Paper dictionary or None if not found
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        if paper_id in self._id_cache:
+            self._id_cache.move_to_end(paper_id)
+            return self._copy_paper(self._id_cache[paper_id])
+
+        conn = self._get_conn()
         cursor = conn.cursor()
 
         # First try with the ID as is
-        cursor.execute("SELECT * FROM papers WHERE arxiv_id = ?", (paper_id,))
+        cursor.execute(f"SELECT {_PAPER_COLUMNS} FROM papers p WHERE p.arxiv_id = ?", (paper_id,))
         row = cursor.fetchone()
 
         # If not found, try with the full URL format
         if row is None:
-            cursor.execute("SELECT * FROM papers WHERE id = ?",
+            cursor.execute(f"SELECT {_PAPER_COLUMNS} FROM papers p WHERE p.id = ?",
                           (f"http://arxiv.org/abs/{paper_id}",))
             row = cursor.fetchone()
 
         if row is None:
-            conn.close()
+            # Misses are not cached, so a paper stored later is always found
             return None
 
-        paper = dict(row)
-        paper['authors'] = self._get_paper_authors(conn, paper['id'])
+        paper = self._row_to_paper(row)
+        self._id_cache[paper_id] = paper
+        if len(self._id_cache) > _ID_CACHE_MAX_ENTRIES:
+            self._id_cache.popitem(last=False)
 
-        conn.close()
-        return paper
+        return self._copy_paper(paper)
+
+    @staticmethod
+    def _copy_paper(paper: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Copy a cached paper so callers cannot modify the cached entry."""
+        if paper is None:
+            return None
+        return dict(paper, authors=list(paper['authors']))
+
+    def _invalidate_ids(self, full_ids: Iterable[str]):
+        """Drop cached get_paper_by_id() results for the given papers."""
+        for full_id in full_ids:
+            self._id_cache.pop(_arxiv_id(full_id), None)
+            self._id_cache.pop(full_id, None)
 
     def get_papers_by_date_range(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
         """Retrieve papers published within a date range.
@@ -249,28 +468,86 @@ class DatabaseManager:
         Returns:
             List of paper dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._get_conn()
         cursor = conn.cursor()
 
         # Format dates to ISO format
         start_str = start_date.strftime("%Y-%m-%dT%H:%M:%S")
         end_str = end_date.strftime("%Y-%m-%dT%H:%M:%S")
 
+        cursor.execute(f"""
+        SELECT {_PAPER_COLUMNS} FROM papers p
+        WHERE p.published_date >= ? AND p.published_date <= ?
+        ORDER BY p.published_date DESC
+        """, (start_str, end_str))
+
+        papers = self._rows_to_papers(cursor.fetchall())
+
+        return papers
+
+    def known_ids(self, start_date: datetime, end_date: datetime) -> Set[str]:
+        """Return the arXiv IDs of stored papers published within a date range.
+
+        Args:
+            start_date: Start of the date range
+            end_date: End of the date range
+
+        Returns:
+            Set of arXiv IDs (e.g., '2104.12345')
+        """
+        conn = self._get_conn()
+        cursor = self._tuple_cursor(conn)
+
+        # Format dates to ISO format
+        start_str = start_date.strftime("%Y-%m-%dT%H:%M:%S")
+        end_str = end_date.strftime("%Y-%m-%dT%H:%M:%S")
+
         cursor.execute("""
-        SELECT * FROM papers
+        SELECT arxiv_id FROM papers
         WHERE published_date >= ? AND published_date <= ?
-        ORDER BY published_date DESC
         """, (start_str, end_str))
 
-        papers = [dict(row) for row in cursor.fetchall()]
+        ids = {row[0] for row in cursor.fetchall()}
 
-        # Add authors to each paper
-        for paper in papers:
-            paper['authors'] = self._get_paper_authors(conn, paper['id'])
+        return ids
 
-        conn.close()
-        return papers
+    def filter_unseen(self, arxiv_ids: Iterable[str]) -> Set[str]:
+        """Return which of the given arXiv IDs are not stored yet.
+
+        The candidate IDs are loaded into a temporary table and SQLite computes
+        the difference with the papers table in a single query.
+
+        Args:
+            arxiv_ids: arXiv IDs to check (e.g., '2104.12345')
+
+        Returns:
+            Set of the given IDs that are not in the database
+        """
+        rows = [(arxiv_id,) for arxiv_id in arxiv_ids]
+        if not rows:
+            return set()
+
+        conn = self._get_conn()
+        cursor = self._tuple_cursor(conn)
+
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS t_ids (arxiv_id TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM t_ids")
+            cursor.executemany("INSERT OR IGNORE INTO t_ids (arxiv_id) VALUES (?)", rows)
+            cursor.execute("""
+            SELECT arxiv_id FROM t_ids
+            WHERE arxiv_id NOT IN (SELECT arxiv_id FROM papers WHERE arxiv_id IS NOT NULL)
+            """)
+            unseen = {row[0] for row in cursor.fetchall()}
+            cursor.execute("DELETE FROM t_ids")
+            conn.commit()
+
+        except Exception as e:
+            conn.rollback()
+            raise e
+
+        return unseen
 
     def get_papers_by_author(self, author_name: str) -> List[Dict[str, Any]]:
         """Retrieve papers by a specific author.
@@ -281,30 +558,36 @@ class DatabaseManager:
         Returns:
             List of paper dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        return list(self.iter_papers_by_author(author_name))
+
+    def iter_papers_by_author(self, author_name: str) -> Iterator[Dict[str, Any]]:
+        """Iterate over papers by a specific author, newest first.
+
+        Args:
+            author_name: Author name to search for
+
+        Yields:
+            Paper dictionaries
+        """
+        conn = self._get_conn()
         cursor = conn.cursor()
 
-        cursor.execute("""
-        SELECT p.* FROM papers p
+        cursor.execute(f"""
+        SELECT {_PAPER_COLUMNS} FROM papers p
         JOIN paper_authors pa ON pa.paper_id = p.id
         JOIN authors a ON a.id = pa.author_id
         WHERE a.name = ?
         ORDER BY p.published_date DESC
         """, (author_name,))
-
-        papers = [dict(row) for row in cursor.fetchall()]
-
-        # Add authors to each paper
-        for paper in papers:
-            paper['authors'] = self._get_paper_authors(conn, paper['id'])
-
-        conn.close()
-        return papers
+        yield from self._iter_rows(cursor)
 
     def search_papers(self, title_keyword: str = None, abstract_keyword: str = None) -> List[Dict[str, Any]]:
         """Search papers by keywords in title or abstract.
 
+        Keywords are matched as word sequences through the full-text index,
+        with the last word also matching as a prefix (e.g. 'deep learn'
+        matches 'Deep Learning').
+
         Args:
             title_keyword: Keyword to search in titles
             abstract_keyword: Keyword to search in abstracts
@@ -312,32 +595,57 @@ class DatabaseManager:
         Returns:
             List of matching paper dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        return list(self.iter_search_papers(title_keyword, abstract_keyword))
+
+    def iter_search_papers(
+        self, title_keyword: str = None, abstract_keyword: str = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over papers matching keywords in title or abstract.
+
+        Takes the same arguments and matches the same way as search_papers.
+
+        Yields:
+            Matching paper dictionaries
+        """
+        conn = self._get_conn()
         cursor = conn.cursor()
 
-        query = "SELECT * FROM papers WHERE 1=1"
+        # Use the full-text index when there is something to match
+        match_terms = []
+        if title_keyword:
+            match_terms.append(f"title : {self._fts_prefix_phrase(title_keyword)}")
+        if abstract_keyword:
+            match_terms.append(f"summary : {self._fts_prefix_phrase(abstract_keyword)}")
+
+        if match_terms:
+            try:
+                cursor.execute(f"""
+                SELECT {_PAPER_COLUMNS} FROM papers p
+                WHERE p.rowid IN (SELECT rowid FROM papers_fts WHERE papers_fts MATCH ?)
+                ORDER BY p.published_date DESC
+                """, (" AND ".join(match_terms),))
+            except sqlite3.OperationalError:
+                # No FTS5 support or index; fall back to scanning with LIKE
+                pass
+            else:
+                yield from self._iter_rows(cursor)
+                return
+
+        query = f"SELECT {_PAPER_COLUMNS} FROM papers p WHERE 1=1"
         params = []
 
         if title_keyword:
-            query += " AND title LIKE ?"
+            query += " AND p.title LIKE ?"
             params.append(f'%{title_keyword}%')
 
         if abstract_keyword:
-            query += " AND summary LIKE ?"
+            query += " AND p.summary LIKE ?"
             params.append(f'%{abstract_keyword}%')
 
-        query += " ORDER BY published_date DESC"
+        query += " ORDER BY p.published_date DESC"
 
         cursor.execute(query, params)
-        papers = [dict(row) for row in cursor.fetchall()]
-
-        # Add authors to each paper
-        for paper in papers:
-            paper['authors'] = self._get_paper_authors(conn, paper['id'])
-
-        conn.close()
-        return papers
+        yield from self._iter_rows(cursor)
 
     def delete_paper(self, paper_id: str) -> bool:
         """Delete a paper from the database.
@@ -348,7 +656,7 @@ class DatabaseManager:
         Returns:
             True if the paper was deleted, False if not found
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._get_conn()
         cursor = conn.cursor()
 
         try:
@@ -368,33 +676,58 @@ class DatabaseManager:
                 cursor.execute("SELECT id FROM papers WHERE id = ?", (full_id,))
                 if not cursor.fetchone():
                     conn.rollback()
-                    conn.close()
                     return False
 
+            # Remember the paper's authors so only they are checked for orphans
+            cursor.execute("SELECT author_id FROM paper_authors WHERE paper_id = ?", (full_id,))
+            author_ids = [row[0] for row in cursor.fetchall()]
+
             # Delete from paper_authors (cascade should handle this, but being explicit)
             cursor.execute("DELETE FROM paper_authors WHERE paper_id = ?", (full_id,))
 
             # Delete the paper
             cursor.execute("DELETE FROM papers WHERE id = ?", (full_id,))
+            result = cursor.rowcount > 0
 
-            # Remove orphaned authors
-            cursor.execute("""
-            DELETE FROM authors
-            WHERE id NOT IN (SELECT DISTINCT author_id FROM paper_authors)
-            """)
+            # Remove authors left without papers, looking only at this paper's authors
+            if author_ids:
+                placeholders = ",".join("?" * len(author_ids))
+                cursor.execute(f"""
+                DELETE FROM authors
+                WHERE id IN ({placeholders})
+                AND NOT EXISTS (SELECT 1 FROM paper_authors WHERE author_id = authors.id)
+                """, author_ids)
 
             # Commit transaction
             conn.commit()
-            result = cursor.rowcount > 0
+
+            self._id_cache.pop(paper_id, None)
+            self._invalidate_ids([full_id])
 
         except Exception as e:
             conn.rollback()
             raise e
-        finally:
-            conn.close()
 
         return result
 
+    def vacuum_orphan_authors(self) -> int:
+        """Delete authors that are no longer linked to any paper.
+
+        delete_paper() already removes the orphans it creates; this sweeps up
+        any left behind by other changes, e.g. papers re-stored with a new
+        author list.
+
+        Returns:
+            Number of authors deleted
+        """
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute("""
+        DELETE FROM authors
+        WHERE NOT EXISTS (SELECT 1 FROM paper_authors WHERE author_id = authors.id)
+        """)
+        return cursor.rowcount
+
     def get_recent_papers(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get the most recently published papers.
 
@@ -404,7 +737,15 @@ class DatabaseManager:
         Returns:
             List of paper dictionaries, ordered by publication date
         """
-        return self.get_papers(limit=limit, order_direction="DESC")
+        conn = self._get_conn()
+        cursor = conn.cursor()
+
+        # Fixed statement that walks idx_papers_published backwards
+        cursor.execute(
+            f"SELECT {_PAPER_COLUMNS} FROM papers p ORDER BY p.published_date DESC LIMIT ?",
+            (limit,)
+        )
+        return self._rows_to_papers(cursor.fetchall())
 
     def count_papers_by_category(self) -> Dict[str, int]:
         """Count papers by category.
@@ -412,8 +753,8 @@ class DatabaseManager:
         Returns:
             Dictionary mapping category names to paper counts
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._get_conn()
+        cursor = self._tuple_cursor(conn)
 
         cursor.execute("""
         SELECT category, COUNT(*) as count
@@ -424,7 +765,6 @@ class DatabaseManager:
         """)
 
         counts = {row[0]: row[1] for row in cursor.fetchall()}
-        conn.close()
 
         return counts
 
@@ -447,8 +787,19 @@ class DatabaseManager:
             if backup_dir and not os.path.exists(backup_dir):
                 os.makedirs(backup_dir)
 
-            # Copy the database file
-            shutil.copy2(self.db_path, backup_path)
+            # Use SQLite's online backup so pages still in the WAL are included;
+            # copy in steps of 1024 pages so writers are not blocked throughout.
+            # Read from a dedicated connection so a transaction left open on the
+            # shared connection can neither stall the backup nor leak into it.
+            source_conn = sqlite3.connect(self.db_path)
+            try:
+                backup_conn = sqlite3.connect(backup_path)
+                try:
+                    source_conn.backup(backup_conn, pages=1024)
+                finally:
+                    backup_conn.close()
+            finally:
+                source_conn.close()
             return True
 
         except Exception:
@@ -0,0 +1,81 @@
+"""Shared fixtures for the arXiv Harvester test suite."""
+
+import copy
+import json
+import os
+
+import pytest
+
+try:
+    from orjson import loads
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    from json import loads
+
+
+def _load_sample_response():
+    """Load the sample API response from disk, or fall back to a basic mock."""
+    fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures', 'arxiv_response.json')
+    if os.path.exists(fixture_path):
+        with open(fixture_path, 'rb') as f:
+            return loads(f.read())
+
+    # Basic mock response
+    return {
+        'feed': {
+            'entry': [
+                {
+                    'id': 'http://arxiv.org/abs/2104.12345',
+                    'title': 'Sample Paper Title',
+                    'summary': 'This is a sample abstract.',
+                    'author': [{'name': 'Author One'}, {'name': 'Author Two'}],
+                    'published': '2021-04-15T00:00:00Z',
+                    'link': [{'href': 'http://arxiv.org/pdf/2104.12345'}]
+                }
+            ]
+        }
+    }
+
+
+# Parsed once at import; tests only read from it
+SAMPLE_RESPONSE = _load_sample_response()
+
+
+@pytest.fixture(scope="session")
+def sample_response():
+    """Fixture to provide a sample API response."""
+    return SAMPLE_RESPONSE
+
+
+@pytest.fixture(scope="session")
+def sample_response_bytes(sample_response):
+    """Fixture to provide the sample API response as an encoded JSON body."""
+    return json.dumps(sample_response).encode('utf-8')
+
+
+# Papers shared by the store and scheduler tests; fixtures hand out copies
+SAMPLE_PAPERS = [
+    {
+        'id': 'http://arxiv.org/abs/2104.12345',
+        'title': 'Sample Paper Title 1',
+        'summary': 'This is a sample abstract for paper 1.',
+        'authors': ['Author One', 'Author Two'],
+        'published_date': '2021-04-15T00:00:00Z',
+        'pdf_url': 'http://arxiv.org/pdf/2104.12345',
+        'category': 'cs.AI'
+    },
+    {
+        'id': 'http://arxiv.org/abs/2104.67890',
+        'title': 'Sample Paper Title 2',
+        'summary': 'This is a sample abstract for paper 2.',
+        'authors': ['Author Three'],
+        'published_date': '2021-04-16T00:00:00Z',
+        'pdf_url': 'http://arxiv.org/pdf/2104.67890',
+        'category': 'cs.CL'
+    }
+]
+
+
+@pytest.fixture
+def sample_papers():
+    """Fixture to provide sample paper data that tests may modify."""
+    return copy.deepcopy(SAMPLE_PAPERS)
@@ -1,13 +1,15 @@
 """Tests for the arXiv API client."""
 
+import io
 import pytest
 import requests
-from unittest.mock import patch
-from datetime import datetime, timedelta
-import json
+from unittest.mock import MagicMock, PropertyMock, patch
+from datetime import datetime
 import os
+from urllib.parse import parse_qs, unquote, urlparse
 
 # Import the module we'll be testing (we'll create this file soon)
+from src.arxiv_harvester.api import client as client_module
 from src.arxiv_harvester.api.client import ArxivApiClient
 
 
@@ -20,29 +22,21 @@ class TestArxivApiClient:
         return ArxivApiClient()
 
     @pytest.fixture
-    def sample_response(self):
-        """Fixture to provide a sample API response."""
-        # Load a sample response from a file if it exists, otherwise use a basic mock
-        fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures', 'arxiv_response.json')
-        if os.path.exists(fixture_path):
-            with open(fixture_path, 'r') as f:
-                return json.load(f)
-        else:
-            # Basic mock response
-            return {
-                'feed': {
-                    'entry': [
-                        {
-                            'id': 'http://arxiv.org/abs/2104.12345',
-                            'title': 'Sample Paper Title',
-                            'summary': 'This is a sample abstract.',
-                            'author': [{'name': 'Author One'}, {'name': 'Author Two'}],
-                            'published': '2021-04-15T00:00:00Z',
-                            'link': [{'href': 'http://arxiv.org/pdf/2104.12345'}]
-                        }
-                    ]
-                }
-            }
+    def mock_response(self):
+        """Fixture to create a successful response restricted to the Response API."""
+        response = MagicMock(spec=requests.Response)
+        response.status_code = 200
+        # The client streams the body from .raw; serve whatever .content holds
+        type(response).raw = PropertyMock(side_effect=lambda: io.BytesIO(response.content))
+        return response
+
+    @pytest.fixture
+    def mocked_get(self, monkeypatch, mock_response, sample_response_bytes):
+        """Fixture to patch HTTP GETs to return the sample response."""
+        mock_response.content = sample_response_bytes
+        mock_get = MagicMock(return_value=mock_response)
+        monkeypatch.setattr(requests.Session, 'get', mock_get)
+        return mock_get
 
     # Test 1: Verify initialization with default parameters
     def test_init_default_parameters(self, api_client):
@@ -59,151 +53,42 @@ class TestArxivApiClient:
         assert client.delay == 5.0
         assert client.timeout == 60
 
-    # Test 3: Test search with basic query
-    @patch('requests.get')
-    def test_search_basic_query(self, mock_get, api_client, sample_response):
-        """Test basic search query functionality."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
-        # Prepare mock to capture the URL
-        def side_effect(url, *args, **kwargs):
-            mock_get.call_args = ((url,), kwargs)
-            return mock_get.return_value
-        mock_get.side_effect = side_effect
-
-        results = api_client.search(query='machine learning')
+    # Tests 3-8: Test search query parameters
+    @pytest.mark.parametrize("kwargs, expected_terms, expected_params", [
+        ({'query': 'machine learning'}, ['machine learning'], {}),
+        ({'query': 'neural networks', 'category': 'cs.AI'}, ['neural networks', 'cat:cs.AI'], {}),
+        ({'query': 'reinforcement learning',
+          'start_date': datetime(2023, 12, 2), 'end_date': datetime(2024, 1, 1)},
+         ['reinforcement learning', 'submittedDate:[20231202000000 TO 20240101000000]'], {}),
+        ({'query': 'deep learning', 'max_results': 50}, ['deep learning'], {'max_results': '50'}),
+        ({'query': 'quantum computing', 'sort_by': 'lastUpdatedDate'},
+         ['quantum computing'], {'sortBy': 'lastUpdatedDate'}),
+        ({'query': 'natural language processing', 'sort_by': 'submittedDate', 'sort_order': 'descending'},
+         ['natural language processing'], {'sortBy': 'submittedDate', 'sortOrder': 'descending'}),
+    ], ids=['basic', 'category', 'date_range', 'max_results', 'sorting', 'sorting_order'])
+    def test_search_urls(self, mocked_get, api_client, kwargs, expected_terms, expected_params):
+        """Test that search parameters are passed to the API in the request URL."""
+        results = api_client.search(**kwargs)
 
         # Verify the API was called with the correct parameters
-        mock_get.assert_called_once()
-        assert 'machine learning' in mock_get.call_args[0][0]
+        mocked_get.assert_called_once()
+        params = parse_qs(urlparse(mocked_get.call_args.args[0]).query)
+        search_query = params['search_query'][0]
+        for term in expected_terms:
+            assert term in search_query
+        for name, value in expected_params.items():
+            assert params[name] == [value]
 
         # Verify the results are processed correctly
         assert len(results) > 0
         assert 'title' in results[0]
         assert 'id' in results[0]
 
-    # Test 4: Test search with category filter
-    @patch('requests.get')
-    def test_search_with_category(self, mock_get, api_client, sample_response):
-        """Test search with category filter."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
-        # Prepare mock to capture the URL
-        def side_effect(url, *args, **kwargs):
-            mock_get.call_args = ((url,), kwargs)
-            return mock_get.return_value
-        mock_get.side_effect = side_effect
-
-        results = api_client.search(query='neural networks', category='cs.AI')
-
-        # Verify the API was called with the correct parameters
-        mock_get.assert_called_once()
-        assert 'neural networks' in mock_get.call_args[0][0]
-        assert 'cat:cs.AI' in mock_get.call_args[0][0]
-        assert results is not None  # Verify results were returned
-
-    # Test 5: Test search with date range
-    @patch('requests.get')
-    def test_search_with_date_range(self, mock_get, api_client, sample_response):
-        """Test search with date range filter."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
-        # Prepare mock to capture the URL
-        def side_effect(url, *args, **kwargs):
-            mock_get.call_args = ((url,), kwargs)
-            return mock_get.return_value
-        mock_get.side_effect = side_effect
-
-        start_date = datetime.now() - timedelta(days=30)
-        end_date = datetime.now()
-
-        results = api_client.search(
-            query='reinforcement learning',
-            start_date=start_date,
-            end_date=end_date
-        )
-
-        # Verify the API was called with the correct parameters
-        mock_get.assert_called_once()
-        assert 'reinforcement learning' in mock_get.call_args[0][0]
-        assert 'submittedDate:' in mock_get.call_args[0][0]
-        assert results is not None  # Verify results were returned
-
-    # Test 6: Test search with max results
-    @patch('requests.get')
-    def test_search_with_max_results(self, mock_get, api_client, sample_response):
-        """Test search with max results parameter."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
-        # Prepare mock to capture the URL
-        def side_effect(url, *args, **kwargs):
-            mock_get.call_args = ((url,), kwargs)
-            return mock_get.return_value
-        mock_get.side_effect = side_effect
-
-        results = api_client.search(query='deep learning', max_results=50)
-
-        # Verify the API was called with the correct parameters
-        mock_get.assert_called_once()
-        assert 'deep learning' in mock_get.call_args[0][0]
-        assert results is not None  # Verify results were returned
-        assert 'max_results=50' in mock_get.call_args[0][0]
-
-    # Test 7: Test search with sorting
-    @patch('requests.get')
-    def test_search_with_sorting(self, mock_get, api_client, sample_response):
-        """Test search with sorting parameter."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
-        # Prepare mock to capture the URL
-        def side_effect(url, *args, **kwargs):
-            mock_get.call_args = ((url,), kwargs)
-            return mock_get.return_value
-        mock_get.side_effect = side_effect
-
-        results = api_client.search(query='quantum computing', sort_by='lastUpdatedDate')
-
-        # Verify the API was called with the correct parameters
-        mock_get.assert_called_once()
-        assert 'quantum computing' in mock_get.call_args[0][0]
-        assert 'sortBy=lastUpdatedDate' in mock_get.call_args[0][0]
-        assert results is not None  # Verify results were returned
-
-    # Test 8: Test search with sorting order
-    @patch('requests.get')
-    def test_search_with_sorting_order(self, mock_get, api_client, sample_response):
-        """Test search with sorting order parameter."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
-        # Prepare mock to capture the URL
-        def side_effect(url, *args, **kwargs):
-            mock_get.call_args = ((url,), kwargs)
-            return mock_get.return_value
-        mock_get.side_effect = side_effect
-
-        results = api_client.search(query='natural language processing',
-                                   sort_by='submittedDate',
-                                   sort_order='descending')
-
-        # Verify the API was called with the correct parameters
-        mock_get.assert_called_once()
-        assert 'natural language processing' in mock_get.call_args[0][0]
-        assert 'sortBy=submittedDate' in mock_get.call_args[0][0]
-        assert results is not None  # Verify results were returned
-        assert 'sortOrder=descending' in mock_get.call_args[0][0]
-
     # Test 9: Test handling of API error
-    @patch('requests.get')
-    def test_handle_api_error(self, mock_get, api_client):
+    def test_handle_api_error(self, mocked_get, api_client):
         """Test proper handling of API errors."""
-        mock_get.return_value.status_code = 500
-        mock_get.return_value.content = b'Internal Server Error'
+        mocked_get.return_value.status_code = 500
+        mocked_get.return_value.content = b'Internal Server Error'
 
         with pytest.raises(Exception) as excinfo:
             api_client.search(query='error test')
@@ -211,29 +96,26 @@ class TestArxivApiClient:
         assert "API request failed" in str(excinfo.value)
 
     # Test 10: Test handling of connection error
-    @patch('requests.get')
-    def test_handle_connection_error(self, mock_get, api_client):
+    def test_handle_connection_error(self, mocked_get, api_client):
         """Test proper handling of connection errors."""
-        mock_get.side_effect = requests.exceptions.ConnectionError("Connection failed")
+        mocked_get.side_effect = requests.exceptions.ConnectionError("Connection failed")
 
         with pytest.raises(requests.exceptions.ConnectionError):
             api_client.search(query='connection test')
 
     # Test 11: Test handling of timeout error
-    @patch('requests.get')
-    def test_handle_timeout_error(self, mock_get, api_client):
+    def test_handle_timeout_error(self, mocked_get, api_client):
         """Test proper handling of timeout errors."""
-        mock_get.side_effect = requests.exceptions.Timeout("Request timed out")
+        mocked_get.side_effect = requests.exceptions.Timeout("Request timed out")
 
         with pytest.raises(requests.exceptions.Timeout):
             api_client.search(query='timeout test')
 
     # Test 12: Test response parsing with malformed data
-    @patch('requests.get')
-    def test_handle_malformed_response(self, mock_get, api_client):
+    def test_handle_malformed_response(self, mocked_get, api_client):
         """Test proper handling of malformed response data."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = b'Not a valid XML or JSON'
+        mocked_get.return_value.status_code = 200
+        mocked_get.return_value.content = b'Not a valid XML or JSON'
 
         with pytest.raises(Exception) as excinfo:
             api_client.search(query='malformed test')
@@ -241,27 +123,24 @@ class TestArxivApiClient:
         assert "Failed to parse response" in str(excinfo.value)
 
     # Test 13: Test rate limiting functionality
-    @patch('requests.get')
     @patch('time.sleep')
-    def test_rate_limiting(self, mock_sleep, mock_get, api_client, sample_response):
+    @patch('time.monotonic')
+    def test_rate_limiting(self, mock_monotonic, mock_sleep, mocked_get, api_client):
         """Test that rate limiting logic is applied between consecutive requests."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
+        # Second request arrives 1 second after the first, then the sleep ends
+        mock_monotonic.side_effect = [100.0, 101.0, 100.0 + api_client.delay]
 
         api_client.search(query='first query')
         api_client.search(query='second query')  # Should trigger rate limiting
 
-        # Verify that sleep was called between requests
+        # Verify that sleep was called only for the remaining part of the delay
         mock_sleep.assert_called_once()
-        assert mock_sleep.call_args[0][0] == api_client.delay
+        assert mock_sleep.call_args.args[0] == pytest.approx(api_client.delay - 1.0)
+        assert api_client.last_request_time == 100.0 + api_client.delay
 
     # Test 14: Test parsing of paper details
-    @patch('requests.get')
-    def test_parse_paper_details(self, mock_get, api_client, sample_response):
+    def test_parse_paper_details(self, mocked_get, api_client):
         """Test extraction of detailed paper information from response."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
         results = api_client.search(query='detail test')
 
         # Check that all expected fields are extracted
@@ -274,25 +153,122 @@ class TestArxivApiClient:
         assert 'pdf_url' in paper
 
     # Test 15: Test get_paper_by_id function
-    @patch('requests.get')
-    def test_get_paper_by_id(self, mock_get, api_client, sample_response):
+    def test_get_paper_by_id(self, mocked_get, api_client):
         """Test retrieval of a specific paper by its arXiv ID."""
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = json.dumps(sample_response).encode('utf-8')
-
-        # Prepare mock to capture the URL
-        def side_effect(url, *args, **kwargs):
-            mock_get.call_args = ((url,), kwargs)
-            return mock_get.return_value
-        mock_get.side_effect = side_effect
-
         paper_id = '2104.12345'
         paper = api_client.get_paper_by_id(paper_id)
 
         # Verify the API was called with the correct parameters
-        mock_get.assert_called_once()
-        assert f'id_list={paper_id}' in mock_get.call_args[0][0]
+        mocked_get.assert_called_once()
+        assert f'id_list={paper_id}' in unquote(mocked_get.call_args.args[0])
 
         # Verify paper details are extracted correctly
         assert paper['id'] == 'http://arxiv.org/abs/2104.12345'
         assert paper['title'] == 'Sample Paper Title: Deep Learning Approaches'
+
+    # Test 16: Test parsing of an Atom XML response
+    def test_parse_xml_response(self, mocked_get, api_client):
+        """Test extraction of paper information from an arXiv Atom XML response."""
+        fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures', 'arxiv_response.xml')
+        with open(fixture_path, 'rb') as f:
+            mocked_get.return_value.status_code = 200
+            mocked_get.return_value.content = f.read()
+
+        results = api_client.search(query='xml test')
+
+        # Check that both entries are parsed with whitespace stripped
+        assert len(results) == 2
+        paper = results[0]
+        assert paper['id'] == 'http://arxiv.org/abs/2104.12345'
+        assert paper['title'] == 'Sample Paper Title: Deep Learning Approaches'
+        assert paper['summary'] == 'This is a sample abstract discussing deep learning approaches.'
+        assert paper['authors'] == ['Author One', 'Author Two']
+        assert paper['published_date'] == '2021-04-15T00:00:00Z'
+        assert paper['pdf_url'] == 'http://arxiv.org/pdf/2104.12345'
+
+        # Check that a missing PDF link yields an empty string
+        assert results[1]['authors'] == ['Researcher A']
+        assert results[1]['pdf_url'] == ''
+
+    # Test 17: Test closing the HTTP session via the context manager
+    @patch('requests.Session.close')
+    def test_context_manager_closes_session(self, mock_close):
+        """Test that leaving the context manager closes the HTTP session."""
+        with ArxivApiClient() as client:
+            assert isinstance(client, ArxivApiClient)
+            mock_close.assert_not_called()
+
+        mock_close.assert_called_once()
+
+    # Test 18: Test that repeated searches are served from the cache
+    @patch('time.sleep')
+    def test_repeated_search_uses_cache(self, mock_sleep, mocked_get, api_client):
+        """Test that an identical search is answered from the cache without waiting."""
+        first = api_client.search(query='cached query')
+        second = api_client.search(query='cached query')
+
+        # Only the first search should hit the API, and no rate-limit sleep occurs
+        mocked_get.assert_called_once()
+        mock_sleep.assert_not_called()
+        assert second == first
+
+        # Mutating a returned result must not affect the cache
+        second[0]['title'] = 'Changed'
+        assert api_client.search(query='cached query')[0]['title'] == first[0]['title']
+
+    # Test 19: Test that query parameters are percent-encoded
+    def test_search_url_encoding(self, mocked_get, api_client):
+        """Test that special characters in the query are encoded and start is passed."""
+        api_client.search(query='ti:"graph neural"', category='cs.LG', start=20)
+
+        url = mocked_get.call_args.args[0]
+        assert ' ' not in url
+        assert '"' not in url
+        assert 'start=20' in url
+        assert 'ti:"graph neural" AND cat:cs.LG' in unquote(url)
+
+    # Test 20: Test that XML entities are not resolved
+    @patch('time.sleep')
+    def test_xml_entities_not_resolved(self, mock_sleep, mocked_get, api_client, tmp_path):
+        """Test that entities in the feed cannot pull in local files or expand."""
+        secret_path = tmp_path / "secret.txt"
+        secret_path.write_text("TOPSECRET")
+
+        def feed(query, entity):
+            mocked_get.return_value.content = (
+                f'<?xml version="1.0"?><!DOCTYPE feed [{entity}]>'
+                '<feed xmlns="http://www.w3.org/2005/Atom"><entry>'
+                '<id>http://arxiv.org/abs/2104.12345</id><title>Title &e;</title>'
+                '</entry></feed>'
+            ).encode('utf-8')
+            try:
+                return api_client.search(query=query)[0]['title']
+            except Exception as e:
+                # Parsers that reject the entity outright are safe as well
+                assert "Failed to parse response" in str(e)
+                return ''
+
+        assert 'TOPSECRET' not in feed('external', f'<!ENTITY e SYSTEM "{secret_path.as_uri()}">')
+        if client_module._HAVE_LXML:
+            assert feed('internal', '<!ENTITY e "EXPANDED">') == 'Title'
+
+    # Test 21: Test that the response body is streamed into the parser
+    def test_search_streams_response(self, mocked_get, api_client):
+        """Test that XML is read from the raw stream in small pieces and the response is closed."""
+        fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures', 'arxiv_response.xml')
+        with open(fixture_path, 'rb') as f:
+            body = io.BytesIO(f.read())
+
+        # Hand out at most 7 bytes per read, like a slow network stream
+        raw = MagicMock()
+        raw.read.side_effect = lambda size=-1: body.read() if size < 0 else body.read(min(size, 7))
+        type(mocked_get.return_value).raw = PropertyMock(return_value=raw)
+
+        results = api_client.search(query='streamed')
+
+        assert len(results) == 2
+        assert results[0]['title'] == 'Sample Paper Title: Deep Learning Approaches'
+        assert results[1]['authors'] == ['Researcher A']
+        assert mocked_get.call_args.kwargs['stream'] is True
+        assert raw.decode_content is True
+        mocked_get.return_value.close.assert_called_once()
@@ -1,137 +1,224 @@
 """Tests for the Notify module."""
 
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock
+import requests
 import json
+from types import MappingProxyType
+
+try:
+    from orjson import loads
+except ImportError:  # orjson is optional; fall back to the stdlib decoder
+    from json import loads
 
 # Import the module we'll be testing
 from src.arxiv_harvester.notify.slack import SlackNotifier
 
+# Read-only sample papers shared by every test in the session
+SAMPLE_PAPERS = (
+    MappingProxyType({
+        'id': 'http://arxiv.org/abs/2104.12345',
+        'title': 'Sample Paper Title 1',
+        'summary': 'This is a sample abstract for paper 1.',
+        'authors': ('Author One', 'Author Two'),
+        'published_date': '2021-04-15T00:00:00Z',
+        'pdf_url': 'http://arxiv.org/pdf/2104.12345'
+    }),
+    MappingProxyType({
+        'id': 'http://arxiv.org/abs/2104.67890',
+        'title': 'Sample Paper Title 2',
+        'summary': 'This is a sample abstract for paper 2.',
+        'authors': ('Author Three',),
+        'published_date': '2021-04-16T00:00:00Z',
+        'pdf_url': 'http://arxiv.org/pdf/2104.67890'
+    }),
+)
+
+# Twenty short read-only papers for the paper-limit test
+MANY_PAPERS = tuple(MappingProxyType({
+    'id': f'http://arxiv.org/abs/{2104 + i}',
+    'title': f'Paper {i}',
+    'summary': f'Abstract {i}',
+    'authors': (f'Author {i}',),
+    'published_date': f'2021-04-{i + 1:02d}T00:00:00Z',
+    'pdf_url': f'http://arxiv.org/pdf/{2104 + i}'
+}) for i in range(20))
+
+# Fake webhook posted to by the tests; mocked_post answers it with a 200
+WEBHOOK_URL = 'https://hooks.slack.com/services/fake/webhook'
+
+
+@pytest.fixture
+def notifier():
+    """Fixture to create a SlackNotifier instance."""
+    return SlackNotifier()
+
+
+@pytest.fixture(scope="session")
+def sample_papers():
+    """Fixture to provide sample paper data."""
+    return SAMPLE_PAPERS
 
-class TestSlackNotifier:
-    """Test suite for the SlackNotifier class."""
 
-    @pytest.fixture
-    def notifier(self):
-        """Fixture to create a SlackNotifier instance."""
-        return SlackNotifier()
+class TestSlackNotifier:
+    """Test suite for posting with the SlackNotifier class."""
 
     @pytest.fixture
-    def sample_papers(self):
-        """Fixture to provide sample paper data."""
-        return [
-            {
-                'id': 'http://arxiv.org/abs/2104.12345',
-                'title': 'Sample Paper Title 1',
-                'summary': 'This is a sample abstract for paper 1.',
-                'authors': ['Author One', 'Author Two'],
-                'published_date': '2021-04-15T00:00:00Z',
-                'pdf_url': 'http://arxiv.org/pdf/2104.12345'
-            },
-            {
-                'id': 'http://arxiv.org/abs/2104.67890',
-                'title': 'Sample Paper Title 2',
-                'summary': 'This is a sample abstract for paper 2.',
-                'authors': ['Author Three'],
-                'published_date': '2021-04-16T00:00:00Z',
-                'pdf_url': 'http://arxiv.org/pdf/2104.67890'
-            }
-        ]
+    def mocked_post(self, monkeypatch):
+        """Fixture to patch HTTP POSTs to return a successful response."""
+        mock_post = MagicMock()
+        mock_post.return_value.status_code = 200
+        monkeypatch.setattr(requests.Session, 'post', mock_post)
+        return mock_post
 
     # Test 1: Test initialization
     def test_init(self, notifier):
         """Test initialization of SlackNotifier."""
         assert isinstance(notifier, SlackNotifier)
 
-    # Test 2: Test message formatting for a single paper
-    def test_format_paper_message(self, notifier, sample_papers):
-        """Test formatting a message for a single paper."""
-        paper = sample_papers[0]
-        message = notifier.format_paper_message(paper)
-
-        # Check that the message contains essential information
-        assert paper['title'] in message
-        assert paper['summary'] in message
-        assert paper['pdf_url'] in message
-        for author in paper['authors']:
-            assert author in message
-
-    # Test 3: Test message formatting for multiple papers
-    def test_format_papers_message(self, notifier, sample_papers):
-        """Test formatting a message for multiple papers."""
-        message = notifier.format_papers_message(sample_papers)
-
-        # Check that the message contains information from both papers
-        assert sample_papers[0]['title'] in message
-        assert sample_papers[1]['title'] in message
-
     # Test 4: Test successful posting to Slack
-    @patch('requests.post')
-    def test_post_to_slack_success(self, mock_post, notifier, sample_papers):
+    def test_post_to_slack_success(self, mocked_post, notifier, sample_papers):
         """Test successfully posting to Slack."""
         # Mock successful response
-        mock_post.return_value.status_code = 200
+        mocked_post.return_value.status_code = 200
 
         # Call the method
-        result = notifier.post_papers_to_slack(sample_papers, 'https://hooks.slack.com/services/fake/webhook')
+        result = notifier.post_papers_to_slack(sample_papers, WEBHOOK_URL)
 
         # Verify the result
         assert result is True
-        mock_post.assert_called_once()
+        mocked_post.assert_called_once()
 
         # Verify the payload
-        call_args = mock_post.call_args
-        payload = json.loads(call_args[1]['data'])
+        call_args = mocked_post.call_args
+        payload = loads(call_args.kwargs['data'])
         assert 'text' in payload
         assert sample_papers[0]['title'] in payload['text']
 
     # Test 5: Test handling of failed posting to Slack
-    @patch('requests.post')
-    def test_post_to_slack_failure(self, mock_post, notifier, sample_papers):
+    def test_post_to_slack_failure(self, mocked_post, notifier, sample_papers):
         """Test handling of failed Slack posting."""
         # Mock failed response
-        mock_post.return_value.status_code = 400
-        mock_post.return_value.text = 'Bad Request'
+        mocked_post.return_value.status_code = 400
+        mocked_post.return_value.text = 'Bad Request'
 
         # Call the method
-        result = notifier.post_papers_to_slack(sample_papers, 'https://hooks.slack.com/services/fake/webhook')
+        result = notifier.post_papers_to_slack(sample_papers, WEBHOOK_URL)
 
         # Verify the result
         assert result is False
 
     # Test 6: Test handling of exception during posting
-    @patch('requests.post')
-    def test_post_to_slack_exception(self, mock_post, notifier, sample_papers):
+    def test_post_to_slack_exception(self, mocked_post, notifier, sample_papers):
         """Test handling of exception during Slack posting."""
         # Mock an exception
-        mock_post.side_effect = Exception('Connection error')
+        mocked_post.side_effect = Exception('Connection error')
 
         # Call the method
-        result = notifier.post_papers_to_slack(sample_papers, 'https://hooks.slack.com/services/fake/webhook')
+        result = notifier.post_papers_to_slack(sample_papers, WEBHOOK_URL)
 
         # Verify the result
         assert result is False
 
     # Test 7: Test posting with custom message
-    @patch('requests.post')
-    def test_post_to_slack_custom_message(self, mock_post, notifier):
+    def test_post_to_slack_custom_message(self, mocked_post, notifier):
         """Test posting a custom message to Slack."""
         # Mock successful response
-        mock_post.return_value.status_code = 200
+        mocked_post.return_value.status_code = 200
 
         # Call the method with a custom message
         custom_message = 'Custom message for testing'
-        result = notifier.post_message_to_slack(custom_message, 'https://hooks.slack.com/services/fake/webhook')
+        result = notifier.post_message_to_slack(custom_message, WEBHOOK_URL)
 
         # Verify the result
         assert result is True
-        mock_post.assert_called_once()
+        mocked_post.assert_called_once()
 
         # Verify the payload
-        call_args = mock_post.call_args
-        payload = json.loads(call_args[1]['data'])
+        call_args = mocked_post.call_args
+        payload = loads(call_args.kwargs['data'])
         assert payload['text'] == custom_message
 
+    # Test 10: Test posting with blocks format
+    def test_post_with_blocks(self, mocked_post, notifier, sample_papers):
+        """Test posting with Slack blocks format."""
+        # Mock successful response
+        mocked_post.return_value.status_code = 200
+
+        # Call the method with blocks=True
+        result = notifier.post_papers_to_slack(sample_papers, WEBHOOK_URL, use_blocks=True)
+
+        # Verify the result
+        assert result is True
+        mocked_post.assert_called_once()
+
+        # Verify the payload contains blocks
+        call_args = mocked_post.call_args
+        payload = loads(call_args.kwargs['data'])
+        assert 'blocks' in payload
+
+    # Test 11: Test handling of empty paper list
+    def test_handle_empty_paper_list(self, mocked_post, notifier):
+        """Test handling of empty paper list."""
+        # Call the method with an empty list
+        result = notifier.post_papers_to_slack([], WEBHOOK_URL)
+
+        # Verify no request was made and the result is False
+        mocked_post.assert_not_called()
+        assert result is False
+
+    # Test 19: Test posting the same papers to several webhooks
+    def test_post_to_many_webhooks(self, mocked_post, notifier, sample_papers):
+        """Test posting papers to multiple webhooks concurrently."""
+        webhooks = [
+            'https://hooks.slack.com/services/fake/one',
+            'https://hooks.slack.com/services/fake/two',
+            'https://hooks.slack.com/services/fake/three'
+        ]
+
+        def side_effect(url, *args, **kwargs):
+            response = mocked_post.return_value.__class__()
+            response.status_code = 400 if url.endswith('two') else 200
+            return response
+        mocked_post.side_effect = side_effect
+
+        results = notifier.post_papers_to_slack_many(sample_papers, webhooks)
+
+        # Results follow the order of the webhooks
+        assert results == [True, False, True]
+        assert mocked_post.call_count == 3
+
+        # Every webhook receives the same payload
+        payloads = {call.kwargs['data'] for call in mocked_post.call_args_list}
+        assert len(payloads) == 1
+        assert sample_papers[0]['title'] in loads(payloads.pop())['text']
+
+
+class TestSlackFormatting:
+    """Test suite for SlackNotifier message formatting, which makes no HTTP calls."""
+
+    # Test 2: Test message formatting for a single paper
+    def test_format_paper_message(self, notifier, sample_papers):
+        """Test formatting a message for a single paper."""
+        paper = sample_papers[0]
+        message = notifier.format_paper_message(paper)
+
+        # Check that the message contains essential information
+        assert paper['title'] in message
+        assert paper['summary'] in message
+        assert paper['pdf_url'] in message
+        for author in paper['authors']:
+            assert author in message
+
+    # Test 3: Test message formatting for multiple papers
+    def test_format_papers_message(self, notifier, sample_papers):
+        """Test formatting a message for multiple papers."""
+        message = notifier.format_papers_message(sample_papers)
+
+        # Check that the message contains information from both papers
+        assert sample_papers[0]['title'] in message
+        assert sample_papers[1]['title'] in message
+
     # Test 8: Test message truncation for long messages
     def test_message_truncation(self, notifier):
         """Test that long messages are truncated."""
@@ -161,36 +248,6 @@ class TestSlackNotifier:
         assert paper['title'] in block_text
         assert paper['pdf_url'] in block_text
 
-    # Test 10: Test posting with blocks format
-    @patch('requests.post')
-    def test_post_with_blocks(self, mock_post, notifier, sample_papers):
-        """Test posting with Slack blocks format."""
-        # Mock successful response
-        mock_post.return_value.status_code = 200
-
-        # Call the method with blocks=True
-        result = notifier.post_papers_to_slack(sample_papers, 'https://hooks.slack.com/services/fake/webhook', use_blocks=True)
-
-        # Verify the result
-        assert result is True
-        mock_post.assert_called_once()
-
-        # Verify the payload contains blocks
-        call_args = mock_post.call_args
-        payload = json.loads(call_args[1]['data'])
-        assert 'blocks' in payload
-
-    # Test 11: Test handling of empty paper list
-    @patch('requests.post')
-    def test_handle_empty_paper_list(self, mock_post, notifier):
-        """Test handling of empty paper list."""
-        # Call the method with an empty list
-        result = notifier.post_papers_to_slack([], 'https://hooks.slack.com/services/fake/webhook')
-
-        # Verify no request was made and the result is False
-        mock_post.assert_not_called()
-        assert result is False
-
     # Test 12: Test custom pre/post message
     def test_custom_pre_post_message(self, notifier, sample_papers):
         """Test adding custom pre/post messages."""
@@ -231,18 +288,8 @@ class TestSlackNotifier:
     # Test 14: Test maximum papers limit
     def test_max_papers_limit(self, notifier):
         """Test limiting the number of papers in a message."""
-        # Create many papers
-        many_papers = [{
-            'id': f'http://arxiv.org/abs/{2104 + i}',
-            'title': f'Paper {i}',
-            'summary': f'Abstract {i}',
-            'authors': [f'Author {i}'],
-            'published_date': f'2021-04-{i + 1:02d}T00:00:00Z',
-            'pdf_url': f'http://arxiv.org/pdf/{2104 + i}'
-        } for i in range(20)]
-
         # Format with a limit
-        message = notifier.format_papers_message(many_papers, max_papers=5)
+        message = notifier.format_papers_message(MANY_PAPERS, max_papers=5)
 
         # Count papers in message
         paper_count = message.count("Title:")
@@ -263,3 +310,68 @@ class TestSlackNotifier:
         # Check for markdown elements
         assert "**Title:**" in message or "*Title:*" in message
         assert "[PDF]" in message
+
+    # Test 16: Test that per-paper formatting is cached and invalidated on settings change
+    def test_format_cache(self, notifier, sample_papers):
+        """Test caching of formatted papers and invalidation on settings change."""
+        paper = sample_papers[0]
+
+        # Repeated formatting of the same paper hits the cache
+        first = notifier.format_paper_message(paper)
+        assert notifier.format_paper_message(paper) is first
+        assert notifier.format_paper_blocks(paper) == notifier.format_paper_blocks(paper)
+
+        # Mutating returned blocks must not affect the cache
+        blocks = notifier.format_paper_blocks(paper)
+        blocks[0]['text']['text'] = 'Changed'
+        assert notifier.format_paper_blocks(paper)[0]['text']['text'] != 'Changed'
+
+        # Changing a setting re-renders the paper with the new formatting
+        notifier.set_use_markdown(True)
+        assert "[PDF]" in notifier.format_paper_message(paper)
+        assert "[PDF]" not in first
+
+    # Test 17: Test published date formatting
+    def test_published_date_formatting(self, notifier, sample_papers):
+        """Test that published dates are shortened to YYYY-MM-DD."""
+        paper = dict(sample_papers[0], published_date='2021-04-15T12:34:56.789Z')
+        assert "Published: 2021-04-15\n" in notifier.format_paper_message(paper)
+
+        # Non-ISO dates are passed through unchanged
+        paper = dict(sample_papers[1], published_date='April 2021')
+        assert "Published: April 2021\n" in notifier.format_paper_message(paper)
+        assert "*Published:* April 2021" in json.dumps(notifier.format_paper_blocks(paper))
+
+    # Test 18: Test truncation of a large batch of papers
+    def test_large_batch_truncation(self, notifier):
+        """Test that a long paper list is cut to the message length limit."""
+        many_papers = [{
+            'id': f'http://arxiv.org/abs/{3000 + i}',
+            'title': f'Paper {i}',
+            'summary': 'A' * 500,
+            'authors': [f'Author {i}'],
+            'pdf_url': f'http://arxiv.org/pdf/{3000 + i}'
+        } for i in range(100)]
+
+        message = notifier.format_papers_message(many_papers, post_message="Bye")
+
+        assert len(message) == notifier.max_message_length
+        assert message.endswith('... (message truncated)')
+        assert message.startswith(notifier.format_paper_message(many_papers[0]))
+
+    # Test 19: Test that an updated paper with the same ID is formatted again
+    def test_format_cache_changed_paper(self, notifier, sample_papers):
+        """Test that cached formatting is not reused when a paper's content changes."""
+        notifier.set_important_categories(['cs.AI'])
+        paper = dict(sample_papers[0], title='Old title')
+        assert 'Old title' in notifier.format_paper_message(paper)
+        assert 'Old title' in json.dumps(notifier.format_paper_blocks(paper))
+
+        updated = dict(paper, title='New title v2', category='cs.AI',
+                       authors=['Author One', 'Author Four'])
+        message = notifier.format_paper_message(updated)
+        assert message.startswith('*IMPORTANT* Title: New title v2\n')
+        assert 'Author Four' in message
+
+        header = notifier.format_paper_blocks(updated)[0]['text']['text']
+        assert header == '🔔 *IMPORTANT* - New title v2'
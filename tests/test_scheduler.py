@@ -1,9 +1,9 @@
 """Tests for the Scheduler module."""
 
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, call, patch
+import json
 import os
-import tempfile
 from datetime import datetime, timedelta
 
 # Import the module we'll be testing
@@ -12,57 +12,52 @@ from src.arxiv_harvester.api.client import ArxivApiClient
 from src.arxiv_harvester.store.database import DatabaseManager
 from src.arxiv_harvester.notify.slack import SlackNotifier
 
+# Fixed "current" time returned by the scheduler's clock in tests
+FIXED_NOW = datetime(2024, 1, 15, 12, 0, 0)
+
 
 class TestScheduler:
     """Test suite for the Scheduler class."""
 
     @pytest.fixture
-    def temp_db_path(self):
-        """Fixture to create a temporary database path."""
-        _, temp_path = tempfile.mkstemp(suffix=".db")
-        yield temp_path
-        # Cleanup after test
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    def state_file(self, tmp_path):
+        """Fixture to create a temporary state file path."""
+        return str(tmp_path / "scheduler.state.json")
 
     @pytest.fixture
-    def scheduler(self, temp_db_path):
+    def scheduler(self):
         """Fixture to create a Scheduler instance."""
-        api_client = ArxivApiClient()
-        db_manager = DatabaseManager(temp_db_path)
+        # The API client and notifier are spec'd mocks; building the real ones
+        # would open HTTP sessions that no test uses
+        api_client = MagicMock(spec=ArxivApiClient)
+        # The manager keeps a single connection open, so an in-memory database
+        # lives as long as the scheduler and no test touches the disk
+        db_manager = DatabaseManager(":memory:")
         db_manager.initialize_database()
-        notifier = SlackNotifier()
+        notifier = MagicMock(spec=SlackNotifier)
 
         scheduler = Scheduler(
             api_client=api_client,
             db_manager=db_manager,
-            notifier=notifier
+            notifier=notifier,
+            clock=lambda: FIXED_NOW
         )
         return scheduler
 
     @pytest.fixture
-    def sample_papers(self):
-        """Fixture to provide sample paper data."""
-        return [
-            {
-                'id': 'http://arxiv.org/abs/2104.12345',
-                'title': 'Sample Paper Title 1',
-                'summary': 'This is a sample abstract for paper 1.',
-                'authors': ['Author One', 'Author Two'],
-                'published_date': '2021-04-15T00:00:00Z',
-                'pdf_url': 'http://arxiv.org/pdf/2104.12345',
-                'category': 'cs.AI'
-            },
-            {
-                'id': 'http://arxiv.org/abs/2104.67890',
-                'title': 'Sample Paper Title 2',
-                'summary': 'This is a sample abstract for paper 2.',
-                'authors': ['Author Three'],
-                'published_date': '2021-04-16T00:00:00Z',
-                'pdf_url': 'http://arxiv.org/pdf/2104.67890',
-                'category': 'cs.CL'
-            }
-        ]
+    def harvest_mocks(self, monkeypatch, scheduler):
+        """Fixture to replace the scheduler's harvest steps with mocks.
+
+        The steps are children of one mock, so its mock_calls records the
+        order in which they ran.
+        """
+        mocks = MagicMock(spec=['fetch', 'filter', 'store', 'send', 'save'])
+        monkeypatch.setattr(scheduler, 'fetch_papers', mocks.fetch)
+        monkeypatch.setattr(scheduler, 'filter_new_papers', mocks.filter)
+        monkeypatch.setattr(scheduler, 'store_papers', mocks.store)
+        monkeypatch.setattr(scheduler, 'send_notifications', mocks.send)
+        monkeypatch.setattr(scheduler, 'save_state', mocks.save)
+        return mocks
 
     # Test 1: Test initialization
     def test_init(self, scheduler):
@@ -87,55 +82,40 @@ class TestScheduler:
         assert scheduler.categories == ["cs.AI", "cs.CL"]
         assert scheduler.max_results == 100
 
-    # Test 3: Test fetching papers
-    @patch.object(ArxivApiClient, 'search')
-    def test_fetch_papers(self, mock_search, scheduler, sample_papers):
-        """Test fetching papers from the API."""
-        # Set up the mock
-        mock_search.return_value = sample_papers
+    # Tests 3-5: Test fetching papers with no, one and several categories
+    @pytest.mark.parametrize("categories, expected_indexes", [
+        ([], [0, 1]),
+        (["cs.AI"], [0]),
+        (["cs.AI", "cs.CL"], [0, 1]),
+    ])
+    def test_fetch_papers(self, scheduler, sample_papers, categories, expected_indexes):
+        """Test fetching papers from the API, one search per category."""
+        # Set up the mock to return the papers of the requested category
+        def search(**kwargs):
+            category = kwargs.get('category')
+            return [p for p in sample_papers if category in (None, p['category'])]
+
+        mock_search = scheduler.api_client.search
+        mock_search.side_effect = search
 
         # Set search parameters
         scheduler.set_search_parameters(
             query="machine learning",
-            categories=["cs.AI"]
-        )
-
-        # Call the method
-        papers = scheduler.fetch_papers()
-
-        # Verify the result
-        assert papers == sample_papers
-        mock_search.assert_called_once()
-        args, kwargs = mock_search.call_args
-        assert kwargs['query'] == "machine learning"
-        assert kwargs['category'] == "cs.AI"
-
-    # Test 4: Test fetching papers with multiple categories
-    @patch.object(ArxivApiClient, 'search')
-    def test_fetch_papers_multiple_categories(self, mock_search, scheduler, sample_papers):
-        """Test fetching papers from multiple categories."""
-        # Set up the mock to return different papers for each category
-        mock_search.side_effect = [
-            [sample_papers[0]],  # For cs.AI
-            [sample_papers[1]]   # For cs.CL
-        ]
-
-        # Set search parameters with multiple categories
-        scheduler.set_search_parameters(
-            query="neural networks",
-            categories=["cs.AI", "cs.CL"]
+            categories=categories
         )
 
         # Call the method
         papers = scheduler.fetch_papers()
 
-        # Verify the result
-        assert len(papers) == 2
-        assert papers[0] == sample_papers[0]
-        assert papers[1] == sample_papers[1]
-        assert mock_search.call_count == 2
+        # Verify the result, in category order
+        assert papers == [sample_papers[i] for i in expected_indexes]
+        # Searches run concurrently, so their calls may arrive in any order
+        calls = mock_search.call_args_list
+        assert all(call.kwargs['query'] == "machine learning" for call in calls)
+        assert sorted(str(call.kwargs.get('category')) for call in calls) == \
+            sorted(str(category) for category in categories or [None])
 
-    # Test 5: Test storing fetched papers
+    # Test 6: Test storing fetched papers
     @patch.object(DatabaseManager, 'store_papers')
     def test_store_papers(self, mock_store, scheduler, sample_papers):
         """Test storing papers in the database."""
@@ -145,15 +125,12 @@ class TestScheduler:
         # Verify the call
         mock_store.assert_called_once_with(sample_papers)
 
-    # Test 6: Test checking for new papers
-    @patch.object(DatabaseManager, 'get_paper_by_id')
-    def test_filter_new_papers(self, mock_get_paper, scheduler, sample_papers):
+    # Test 7: Test checking for new papers
+    @patch.object(DatabaseManager, 'filter_unseen')
+    def test_filter_new_papers(self, mock_unseen, scheduler, sample_papers):
         """Test filtering for new papers not already in the database."""
-        # Set up the mock to simulate one existing and one new paper
-        mock_get_paper.side_effect = [
-            None,  # First paper not found (new)
-            sample_papers[1]  # Second paper found (existing)
-        ]
+        # Set up the mock to simulate one new and one existing paper
+        mock_unseen.return_value = {'2104.12345'}  # Only the first paper is new
 
         # Call the method
         new_papers = scheduler.filter_new_papers(sample_papers)
@@ -161,13 +138,15 @@ class TestScheduler:
         # Verify the result
         assert len(new_papers) == 1
         assert new_papers[0] == sample_papers[0]
-        assert mock_get_paper.call_count == 2
 
-    # Test 7: Test sending notifications
-    @patch.object(SlackNotifier, 'post_papers_to_slack')
-    def test_send_notifications(self, mock_post, scheduler, sample_papers):
+        # All IDs are looked up in a single call
+        mock_unseen.assert_called_once_with(['2104.12345', '2104.67890'])
+
+    # Test 8: Test sending notifications
+    def test_send_notifications(self, scheduler, sample_papers):
         """Test sending notifications for new papers."""
         # Mock successful posting
+        mock_post = scheduler.notifier.post_papers_to_slack
         mock_post.return_value = True
 
         # Set webhook URL
@@ -186,18 +165,13 @@ class TestScheduler:
             pre_message="New arXiv papers matching your criteria:"
         )
 
-    # Test 8: Test running the full harvest process
-    @patch.object(Scheduler, 'fetch_papers')
-    @patch.object(Scheduler, 'filter_new_papers')
-    @patch.object(Scheduler, 'store_papers')
-    @patch.object(Scheduler, 'send_notifications')
-    def test_run_harvest(self, mock_send, mock_store, mock_filter, mock_fetch, scheduler, sample_papers):
+    # Test 9: Test running the full harvest process
+    def test_run_harvest(self, harvest_mocks, scheduler, sample_papers):
         """Test running the full harvest process."""
         # Set up the mocks
-        mock_fetch.return_value = sample_papers
-        mock_filter.return_value = [sample_papers[0]]  # Only one new paper
-        mock_store.return_value = None
-        mock_send.return_value = True
+        harvest_mocks.fetch.return_value = sample_papers
+        harvest_mocks.filter.return_value = [sample_papers[0]]  # Only one new paper
+        harvest_mocks.send.return_value = True
 
         # Set search parameters and webhook
         scheduler.set_search_parameters(query="deep learning")
@@ -208,38 +182,33 @@ class TestScheduler:
 
         # Verify the process flow and result
         assert result is True
-        mock_fetch.assert_called_once()
-        mock_filter.assert_called_once_with(sample_papers)
-        mock_store.assert_called_once_with([sample_papers[0]])
-        mock_send.assert_called_once_with([sample_papers[0]])
-
-    # Test 9: Test handling no new papers
-    @patch.object(Scheduler, 'fetch_papers')
-    @patch.object(Scheduler, 'filter_new_papers')
-    @patch.object(Scheduler, 'store_papers')
-    @patch.object(Scheduler, 'send_notifications')
-    def test_run_harvest_no_new_papers(self, mock_send, mock_store, mock_filter, mock_fetch, scheduler, sample_papers):
+        assert scheduler.last_run_time == FIXED_NOW
+        assert harvest_mocks.mock_calls == [
+            call.fetch(),
+            call.filter(sample_papers),
+            call.store([sample_papers[0]]),
+            call.send([sample_papers[0]]),
+        ]
+
+    # Test 10: Test handling no new papers
+    def test_run_harvest_no_new_papers(self, harvest_mocks, scheduler, sample_papers):
         """Test running the harvest when there are no new papers."""
         # Set up the mocks
-        mock_fetch.return_value = sample_papers
-        mock_filter.return_value = []  # No new papers
+        harvest_mocks.fetch.return_value = sample_papers
+        harvest_mocks.filter.return_value = []  # No new papers
 
         # Call the method
         result = scheduler.run_harvest()
 
         # Verify the process flow and result
         assert result is True
-        mock_fetch.assert_called_once()
-        mock_filter.assert_called_once_with(sample_papers)
-        mock_store.assert_not_called()
-        mock_send.assert_not_called()
-
-    # Test 10: Test handling fetch errors
-    @patch.object(ArxivApiClient, 'search')
-    def test_handle_fetch_error(self, mock_search, scheduler):
+        assert harvest_mocks.mock_calls == [call.fetch(), call.filter(sample_papers)]
+
+    # Test 11: Test handling fetch errors
+    def test_handle_fetch_error(self, scheduler):
         """Test handling errors during paper fetching."""
         # Set up the mock to raise an exception
-        mock_search.side_effect = Exception("API Error")
+        scheduler.api_client.search.side_effect = Exception("API Error")
 
         # Set search parameters
         scheduler.set_search_parameters(query="error test")
@@ -250,8 +219,8 @@ class TestScheduler:
 
         assert "Error fetching papers" in str(excinfo.value)
 
-    # Test 11: Test saving and loading state
-    def test_save_load_state(self, scheduler, temp_db_path):
+    # Test 12: Test saving and loading state
+    def test_save_load_state(self, scheduler, state_file):
         """Test saving and loading the scheduler state."""
         # Set up the state
         scheduler.set_search_parameters(
@@ -260,19 +229,16 @@ class TestScheduler:
             max_results=75
         )
         scheduler.set_slack_webhook("https://hooks.slack.com/services/test/webhook")
-        scheduler.set_last_run_time(datetime.now())
-
-        # Create a state file path
-        state_file = os.path.join(os.path.dirname(temp_db_path), "scheduler_state.json")
+        scheduler.set_last_run_time(FIXED_NOW)
 
         # Save the state
         scheduler.save_state(state_file)
 
         # Create a new scheduler
         new_scheduler = Scheduler(
-            api_client=ArxivApiClient(),
-            db_manager=DatabaseManager(temp_db_path),
-            notifier=SlackNotifier()
+            api_client=MagicMock(spec=ArxivApiClient),
+            db_manager=DatabaseManager(":memory:"),
+            notifier=MagicMock(spec=SlackNotifier)
         )
 
         # Load the state
@@ -283,18 +249,13 @@ class TestScheduler:
         assert new_scheduler.categories == ["cs.AI", "cs.CL"]
         assert new_scheduler.max_results == 75
         assert new_scheduler.slack_webhook == "https://hooks.slack.com/services/test/webhook"
-        assert new_scheduler.last_run_time is not None
+        assert new_scheduler.last_run_time == FIXED_NOW
 
-        # Clean up
-        if os.path.exists(state_file):
-            os.remove(state_file)
-
-    # Test 12: Test handling notification failure
-    @patch.object(SlackNotifier, 'post_papers_to_slack')
-    def test_handle_notification_failure(self, mock_post, scheduler, sample_papers):
+    # Test 13: Test handling notification failure
+    def test_handle_notification_failure(self, scheduler, sample_papers):
         """Test handling notification failures."""
         # Mock failed posting
-        mock_post.return_value = False
+        scheduler.notifier.post_papers_to_slack.return_value = False
 
         # Set webhook URL
         webhook_url = "https://hooks.slack.com/services/fake/webhook"
@@ -306,19 +267,23 @@ class TestScheduler:
         # Verify the result
         assert result is False
 
-    # Test 13: Test checking if it's time to run
+    # Test 14: Test checking if it's time to run
     def test_is_time_to_run(self, scheduler):
         """Test checking if it's time to run based on schedule."""
         # Set up a weekly schedule
         scheduler.set_schedule("weekly")
 
         # Set last run time to 8 days ago (should run)
-        past_time = datetime.now() - timedelta(days=8)
+        past_time = FIXED_NOW - timedelta(days=8)
         scheduler.set_last_run_time(past_time)
         assert scheduler.is_time_to_run() is True
 
+        # Exactly one interval ago (should run)
+        scheduler.set_last_run_time(FIXED_NOW - timedelta(days=7))
+        assert scheduler.is_time_to_run() is True
+
         # Set last run time to 2 days ago (should not run)
-        recent_time = datetime.now() - timedelta(days=2)
+        recent_time = FIXED_NOW - timedelta(days=2)
         scheduler.set_last_run_time(recent_time)
         assert scheduler.is_time_to_run() is False
 
@@ -326,9 +291,12 @@ class TestScheduler:
         scheduler.set_schedule("daily")
         assert scheduler.is_time_to_run() is True
 
-    # Test 14: Test command-line argument parsing
-    def test_parse_arguments(self, scheduler):
+    # Test 15: Test command-line argument parsing
+    def test_parse_arguments(self):
         """Test parsing command-line arguments."""
+        # Argument parsing needs no collaborators
+        scheduler = Scheduler(api_client=None, db_manager=None, notifier=None)
+
         # Test with arguments
         args = [
             "--query", "neural networks",
@@ -348,23 +316,13 @@ class TestScheduler:
         assert parsed.webhook == "https://example.com/webhook"
         assert parsed.force_run is True
 
-    # Test 15: Test full workflow with file state
-    @patch.object(Scheduler, 'fetch_papers')
-    @patch.object(Scheduler, 'filter_new_papers')
-    @patch.object(Scheduler, 'store_papers')
-    @patch.object(Scheduler, 'send_notifications')
-    @patch.object(Scheduler, 'save_state')
-    def test_workflow_with_state(self, mock_save, mock_send, mock_store, mock_filter, mock_fetch,
-                                 scheduler, sample_papers, temp_db_path):
+    # Test 16: Test full workflow with file state
+    def test_workflow_with_state(self, harvest_mocks, scheduler, sample_papers, state_file):
         """Test the full workflow with state saving."""
         # Set up the mocks
-        mock_fetch.return_value = sample_papers
-        mock_filter.return_value = [sample_papers[0]]
-        mock_store.return_value = None
-        mock_send.return_value = True
-
-        # Create a state file path
-        state_file = os.path.join(os.path.dirname(temp_db_path), "scheduler_state.json")
+        harvest_mocks.fetch.return_value = sample_papers
+        harvest_mocks.filter.return_value = [sample_papers[0]]
+        harvest_mocks.send.return_value = True
 
         # Set parameters
         scheduler.set_search_parameters(query="quantum computing")
@@ -376,12 +334,29 @@ class TestScheduler:
 
         # Verify the process and state saving
         assert result is True
-        mock_fetch.assert_called_once()
-        mock_filter.assert_called_once_with(sample_papers)
-        mock_store.assert_called_once_with([sample_papers[0]])
-        mock_send.assert_called_once_with([sample_papers[0]])
-        mock_save.assert_called_once_with(state_file)
-
-        # Clean up
-        if os.path.exists(state_file):
-            os.remove(state_file)
+        assert harvest_mocks.mock_calls == [
+            call.fetch(),
+            call.filter(sample_papers),
+            call.store([sample_papers[0]]),
+            call.send([sample_papers[0]]),
+            call.save(state_file),
+        ]
+
+    # Test 17: Test that saving state is atomic and skips unchanged state
+    def test_save_state_atomic(self, scheduler, state_file):
+        """Test that state is replaced atomically and unchanged state is not rewritten."""
+        scheduler.set_search_parameters(query="atomic test")
+
+        with patch('os.replace', wraps=os.replace) as mock_replace:
+            scheduler.save_state(state_file)
+            scheduler.save_state(state_file)
+            assert mock_replace.call_count == 1
+
+            # A changed state is written again
+            scheduler.set_search_parameters(query="changed")
+            scheduler.save_state(state_file)
+            assert mock_replace.call_count == 2
+
+        assert not os.path.exists(f"{state_file}.tmp")
+        with open(state_file) as f:
+            assert json.load(f)["query"] == "changed"
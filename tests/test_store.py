@@ -17,60 +17,69 @@ class TestDatabaseManager:
         """Fixture to create a temporary database path."""
         return str(tmp_path / "test_arxiv.db")
 
+    @pytest.fixture(scope="session")
+    def db_manager(self):
+        """Fixture to create an in-memory DatabaseManager shared by the whole session.
+
+        Tests that inspect the database file or open a second connection use
+        fresh_db_manager instead.
+        """
+        manager = DatabaseManager(":memory:")
+        # Setup: create the tables once
+        manager.initialize_database()
+        yield manager
+        # Teardown: release the shared connection
+        manager.close()
+
+    @pytest.fixture(autouse=True)
+    def _reset_db(self, db_manager):
+        """Fixture to empty the shared database after each test."""
+        yield
+        conn = db_manager._get_conn()
+        conn.execute("DELETE FROM paper_authors")
+        conn.execute("DELETE FROM authors")
+        conn.execute("DELETE FROM papers")
+        db_manager._id_cache.clear()
+
     @pytest.fixture
-    def db_manager(self, db_path):
-        """Fixture to create a DatabaseManager instance."""
+    def fresh_db_manager(self, db_path):
+        """Fixture to create a DatabaseManager with its own database file."""
         manager = DatabaseManager(db_path)
-        # Setup: ensure tables are created
+        # Test files need no durability; WAL stays on because tests check it
+        manager._get_conn().execute("PRAGMA synchronous=OFF")
         manager.initialize_database()
-        return manager
+        yield manager
+        manager.close()
 
-    @pytest.fixture
-    def sample_papers(self):
-        """Fixture to provide sample paper data."""
+    @pytest.fixture(scope="session")
+    def bulk_papers(self):
+        """Fixture to provide ten more papers for pagination tests (read-only)."""
         return [
             {
-                'id': 'http://arxiv.org/abs/2104.12345',
-                'title': 'Sample Paper Title 1',
-                'summary': 'This is a sample abstract for paper 1.',
-                'authors': ['Author One', 'Author Two'],
-                'published_date': '2021-04-15T00:00:00Z',
-                'pdf_url': 'http://arxiv.org/pdf/2104.12345'
-            },
-            {
-                'id': 'http://arxiv.org/abs/2104.67890',
-                'title': 'Sample Paper Title 2',
-                'summary': 'This is a sample abstract for paper 2.',
-                'authors': ['Author Three'],
-                'published_date': '2021-04-16T00:00:00Z',
-                'pdf_url': 'http://arxiv.org/pdf/2104.67890'
+                'id': f'http://arxiv.org/abs/{2104 + i}',
+                'title': f'Additional Paper {i}',
+                'summary': f'This is abstract {i}',
+                'authors': [f'Author {i}'],
+                'published_date': f'2021-05-{i + 1:02d}T00:00:00Z',
+                'pdf_url': f'http://arxiv.org/pdf/{2104 + i}'
             }
+            for i in range(10)
         ]
 
     # Test 1: Verify database initialization
-    def test_initialize_database(self, db_manager, db_path):
+    def test_initialize_database(self, fresh_db_manager, db_path):
         """Test that the database is properly initialized with the expected tables."""
         # Check if the database file was created
         assert os.path.exists(db_path)
 
         # Connect directly to the database to inspect its structure
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        # Check if the papers table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='papers'")
-        assert cursor.fetchone() is not None
-
-        # Check if the authors table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='authors'")
-        assert cursor.fetchone() is not None
-
-        # Check if the paper_authors table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='paper_authors'")
-        assert cursor.fetchone() is not None
-
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
         conn.close()
 
+        # Check that the papers, authors and paper_authors tables exist
+        assert {'papers', 'authors', 'paper_authors'} <= tables
+
     # Test 2: Test storing papers in the database
     def test_store_papers(self, db_manager, sample_papers):
         """Test storing papers in the database."""
@@ -262,10 +271,6 @@ class TestDatabaseManager:
     # Test 12: Test counting papers by category
     def test_count_papers_by_category(self, db_manager, sample_papers):
         """Test counting papers by category."""
-        # Add category field to sample papers
-        sample_papers[0]['category'] = 'cs.AI'
-        sample_papers[1]['category'] = 'cs.CL'
-
         # Store the sample papers
         db_manager.store_papers(sample_papers)
 
@@ -278,48 +283,28 @@ class TestDatabaseManager:
         assert category_counts['cs.CL'] == 1
 
     # Test 13: Test retrieving papers with pagination
-    def test_get_papers_with_pagination(self, db_manager, sample_papers):
+    @pytest.mark.parametrize("limit, offset", [(5, 0), (5, 5), (5, 10)])
+    def test_get_papers_with_pagination(self, db_manager, sample_papers, bulk_papers, limit, offset):
         """Test retrieving papers with pagination."""
-        # Create and store more sample papers to test pagination
-        additional_papers = []
-        for i in range(10):
-            paper = {
-                'id': f'http://arxiv.org/abs/{2104 + i}',
-                'title': f'Additional Paper {i}',
-                'summary': f'This is abstract {i}',
-                'authors': [f'Author {i}'],
-                'published_date': f'2021-05-{i + 1:02d}T00:00:00Z',
-                'pdf_url': f'http://arxiv.org/pdf/{2104 + i}'
-            }
-            additional_papers.append(paper)
-
-        # Store all papers
-        db_manager.store_papers(sample_papers + additional_papers)
-
-        # Test first page (limit=5, offset=0)
-        page1 = db_manager.get_papers(limit=5, offset=0)
-        assert len(page1) == 5
+        # Store all papers; the bulk papers are published after the samples
+        all_papers = sample_papers + bulk_papers
+        db_manager.store_papers(all_papers)
 
-        # Test second page (limit=5, offset=5)
-        page2 = db_manager.get_papers(limit=5, offset=5)
-        assert len(page2) == 5
-
-        # Verify that the pages contain different papers
-        page1_ids = [p['id'] for p in page1]
-        page2_ids = [p['id'] for p in page2]
-        assert not set(page1_ids).intersection(set(page2_ids))  # No overlap between pages
+        # Pages follow the default published_date order without overlap
+        page = db_manager.get_papers(limit=limit, offset=offset)
+        assert [p['id'] for p in page] == [p['id'] for p in all_papers[offset:offset + limit]]
 
     # Test 14: Test database backup functionality
-    def test_backup_database(self, db_manager, sample_papers, tmp_path):
+    def test_backup_database(self, fresh_db_manager, sample_papers, tmp_path):
         """Test backing up the database."""
         # Store sample papers
-        db_manager.store_papers(sample_papers)
+        fresh_db_manager.store_papers(sample_papers)
 
         # Create backup path
         backup_path = str(tmp_path / "backup.db")
 
         # Perform backup
-        db_manager.backup_database(backup_path)
+        fresh_db_manager.backup_database(backup_path)
 
         # Verify backup file exists
         assert os.path.exists(backup_path)
@@ -334,27 +319,221 @@ class TestDatabaseManager:
         # Verify backup contains the same number of papers
         assert count == len(sample_papers)
 
-    # Test 15: Test transaction handling (rollback on error)
-    def test_transaction_rollback(self, db_manager, sample_papers, monkeypatch):
+    # Test 15: Test backing up while the shared connection is mid-transaction
+    def test_backup_database_during_transaction(self, fresh_db_manager, sample_papers, tmp_path):
+        """Test that a backup only contains committed data and does not stall."""
+        fresh_db_manager.store_papers([sample_papers[0]])
+
+        conn = fresh_db_manager._get_conn()
+        conn.execute("BEGIN TRANSACTION")
+        try:
+            conn.execute("DELETE FROM papers")
+            backup_path = str(tmp_path / "backup.db")
+            assert fresh_db_manager.backup_database(backup_path)
+        finally:
+            conn.rollback()
+
+        backup_conn = sqlite3.connect(backup_path)
+        count = backup_conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+        backup_conn.close()
+        assert count == 1
+
+    # Test 16: Test transaction handling (rollback on error)
+    def test_transaction_rollback(self, db_manager, sample_papers):
         """Test that transactions are properly rolled back on error."""
         # Store the first paper successfully
         db_manager.store_papers([sample_papers[0]])
 
-        # Modify the _insert_author method to raise an exception after inserting the paper
-        original_insert_author = db_manager._insert_author
-
-        def mock_insert_author(conn, author_name):
-            if author_name == "Author Three":  # Only fail on the second paper's author
-                raise Exception("Simulated database error")
-            return original_insert_author(conn, author_name)
-
-        monkeypatch.setattr(db_manager, "_insert_author", mock_insert_author)
+        # Make inserting the second paper's author fail, so the error happens
+        # inside the transaction after its paper row has been written
+        conn = db_manager._get_conn()
+        conn.execute("""
+        CREATE TEMP TRIGGER fail_author BEFORE INSERT ON authors
+        WHEN NEW.name = 'Author Three'
+        BEGIN SELECT RAISE(ABORT, 'author insert failed'); END
+        """)
 
         # Try to store the second paper, which should fail
-        with pytest.raises(Exception):
-            db_manager.store_papers([sample_papers[1]])
+        try:
+            with pytest.raises(sqlite3.IntegrityError):
+                db_manager.store_papers([sample_papers[1]])
+        finally:
+            conn.execute("DROP TRIGGER fail_author")
 
         # Verify only the first paper is in the database
         stored_papers = db_manager.get_all_papers()
         assert len(stored_papers) == 1
         assert stored_papers[0]['title'] == sample_papers[0]['title']
+        assert db_manager.get_paper_by_id('2104.67890') is None
+
+    # Test 17: Test retrieving stored arXiv IDs by date range
+    def test_known_ids(self, db_manager, sample_papers):
+        """Test retrieving the arXiv IDs of stored papers within a date range."""
+        # Store the sample papers
+        db_manager.store_papers(sample_papers)
+
+        # Both papers fall inside the wide range
+        ids = db_manager.known_ids(datetime(2021, 4, 14), datetime(2021, 4, 17))
+        assert ids == {'2104.12345', '2104.67890'}
+
+        # Only the second paper falls inside the narrow range
+        ids = db_manager.known_ids(datetime(2021, 4, 16), datetime(2021, 4, 17))
+        assert ids == {'2104.67890'}
+
+    # Test 18: Test that lookup indexes are created
+    def test_indexes_created(self, fresh_db_manager, db_path):
+        """Test that the database is initialized with its lookup indexes."""
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        indexes = {row[0] for row in cursor.fetchall()}
+        conn.close()
+
+        assert {'idx_papers_published', 'idx_papers_category', 'idx_pa_author'} <= indexes
+
+    # Test 19: Test that one WAL-mode connection is reused across calls
+    def test_connection_reuse(self, fresh_db_manager, sample_papers):
+        """Test that the manager keeps a single connection in WAL mode."""
+        conn = fresh_db_manager._get_conn()
+        fresh_db_manager.store_papers(sample_papers)
+        fresh_db_manager.get_all_papers()
+        assert fresh_db_manager._get_conn() is conn
+
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal_mode == 'wal'
+
+        # Closing drops the connection; the next call reopens it
+        fresh_db_manager.close()
+        assert len(fresh_db_manager.get_all_papers()) == len(sample_papers)
+        assert fresh_db_manager._get_conn() is not conn
+
+    # Test 20: Test that the full-text index follows updates and deletes
+    def test_search_index_stays_in_sync(self, db_manager, sample_papers):
+        """Test full-text search after replacing and deleting papers."""
+        db_manager.store_papers(sample_papers)
+
+        # Re-storing a paper with a new title replaces its indexed text
+        db_manager.store_papers([dict(sample_papers[0], title='Graph Transformers')])
+        assert db_manager.search_papers(title_keyword='Title 1') == []
+        papers = db_manager.search_papers(title_keyword='graph transform')
+        assert [paper['title'] for paper in papers] == ['Graph Transformers']
+
+        # Deleted papers disappear from the index
+        db_manager.delete_paper('2104.12345')
+        assert db_manager.search_papers(title_keyword='Graph') == []
+
+        # Quotes in keywords are treated as punctuation rather than query syntax
+        assert len(db_manager.search_papers(title_keyword='"Sample')) == 1
+
+        # The index matches the papers table
+        conn = db_manager._get_conn()
+        conn.execute("INSERT INTO papers_fts (papers_fts) VALUES ('integrity-check')")
+
+    # Test 21: Test caching of paper lookups by ID
+    def test_get_paper_by_id_cache(self, db_manager, sample_papers):
+        """Test that lookups by ID are cached and invalidated on writes."""
+        # Misses are not cached, so the paper is found once it is stored
+        assert db_manager.get_paper_by_id('2104.12345') is None
+        assert '2104.12345' not in db_manager._id_cache
+        db_manager.store_papers([sample_papers[0]])
+        paper = db_manager.get_paper_by_id('2104.12345')
+        assert paper['title'] == sample_papers[0]['title']
+
+        # Returned papers are copies of the cached entry
+        paper['authors'].append('Someone Else')
+        assert db_manager.get_paper_by_id('2104.12345')['authors'] == ['Author One', 'Author Two']
+
+        # Updates and deletes are reflected in later lookups
+        db_manager.store_papers([dict(sample_papers[0], title='Updated Title')])
+        assert db_manager.get_paper_by_id('2104.12345')['title'] == 'Updated Title'
+        db_manager.delete_paper('2104.12345')
+        assert db_manager.get_paper_by_id('2104.12345') is None
+
+    # Test 22: Test computing unseen arXiv IDs in the database
+    def test_filter_unseen(self, db_manager, sample_papers):
+        """Test finding which candidate arXiv IDs are not stored yet."""
+        db_manager.store_papers([sample_papers[0]])
+
+        unseen = db_manager.filter_unseen(['2104.12345', '2104.67890', '2104.67890'])
+        assert unseen == {'2104.67890'}
+
+        # Each call starts from an empty candidate table
+        assert db_manager.filter_unseen(['2104.12345']) == set()
+        assert db_manager.filter_unseen([]) == set()
+
+    # Test 23: Test the denormalized author list and migration of older databases
+    def test_authors_json(self, db_manager, sample_papers, tmp_path):
+        """Test that authors keep their order and older databases still read authors."""
+        # Authors come back in the order they were stored
+        db_manager.store_papers([dict(sample_papers[0], authors=['Zed Last', 'Amy First'])])
+        assert db_manager.get_paper_by_id('2104.12345')['authors'] == ['Zed Last', 'Amy First']
+
+        # A database created before authors_json existed gains the column and
+        # reads its authors from the relationship table
+        legacy_path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(legacy_path)
+        conn.executescript("""
+        CREATE TABLE papers (id TEXT PRIMARY KEY, arxiv_id TEXT UNIQUE, title TEXT NOT NULL,
+            summary TEXT, published_date TEXT, pdf_url TEXT, category TEXT,
+            created_at TIMESTAMP, updated_at TIMESTAMP);
+        CREATE TABLE authors (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL);
+        CREATE TABLE paper_authors (paper_id TEXT, author_id INTEGER,
+            PRIMARY KEY (paper_id, author_id));
+        INSERT INTO papers (id, arxiv_id, title) VALUES ('http://arxiv.org/abs/1', '1', 'Old');
+        INSERT INTO authors (name) VALUES ('Old Author');
+        INSERT INTO paper_authors VALUES ('http://arxiv.org/abs/1', 1);
+        """)
+        conn.close()
+
+        with DatabaseManager(legacy_path) as legacy:
+            legacy.initialize_database()
+            assert legacy.get_paper_by_id('1')['authors'] == ['Old Author']
+            assert legacy.search_papers(title_keyword='Old')[0]['title'] == 'Old'
+
+    # Test 24: Test ordering validation in get_papers
+    def test_get_papers_ordering(self, db_manager, sample_papers):
+        """Test supported orderings and rejection of unsupported ones."""
+        db_manager.store_papers(sample_papers)
+
+        papers = db_manager.get_papers(order_by='title', order_direction='desc')
+        assert [paper['title'] for paper in papers] == ['Sample Paper Title 2', 'Sample Paper Title 1']
+
+        # An offset without a limit skips papers instead of failing
+        assert len(db_manager.get_papers(offset=1)) == 1
+
+        with pytest.raises(ValueError):
+            db_manager.get_papers(order_by='title; DROP TABLE papers')
+        with pytest.raises(ValueError):
+            db_manager.get_papers(order_direction='SIDEWAYS')
+
+    # Test 25: Test cleanup of authors left without papers
+    def test_orphan_author_cleanup(self, db_manager, sample_papers):
+        """Test that deleting papers and vacuuming remove orphaned authors only."""
+        shared = dict(sample_papers[1], authors=['Author One', 'Author Three'])
+        db_manager.store_papers([sample_papers[0], shared])
+
+        def author_names():
+            cursor = db_manager._get_conn().execute("SELECT name FROM authors ORDER BY name")
+            return [row[0] for row in cursor.fetchall()]
+
+        # 'Author Two' is orphaned; 'Author One' is still used by the other paper
+        assert db_manager.delete_paper('2104.12345') is True
+        assert author_names() == ['Author One', 'Author Three']
+
+        # Re-storing with a new author list leaves an orphan for the vacuum
+        db_manager.store_papers([dict(shared, authors=['Author Four'])])
+        assert db_manager.vacuum_orphan_authors() == 2
+        assert author_names() == ['Author Four']
+
+    # Test 26: Test iterating over papers without building a list
+    def test_iter_papers(self, db_manager, sample_papers):
+        """Test that the iterator variants yield the same papers as the list methods."""
+        db_manager.store_papers(sample_papers)
+
+        papers = db_manager.iter_papers(order_direction="DESC")
+        assert not isinstance(papers, list)
+        assert next(papers) == db_manager.get_papers(limit=1, order_direction="DESC")[0]
+        papers.close()
+
+        assert list(db_manager.iter_papers_by_author('Author One')) == db_manager.get_papers_by_author('Author One')
+        assert list(db_manager.iter_search_papers(title_keyword='Sample')) == db_manager.search_papers(title_keyword='Sample')